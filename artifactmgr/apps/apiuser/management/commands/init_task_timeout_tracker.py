@@ -13,6 +13,7 @@ def init_task_timeout_tracker():
     - author_refresh_check
     - public_signing_key
     - token_revocation_list
+    - usage_rollup
     """
     try:
         now = datetime.now(timezone.utc)
@@ -64,6 +65,22 @@ def init_task_timeout_tracker():
             trl.name = os.getenv('TRL_NAME')
             trl.timeout_in_seconds = os.getenv('TRL_TIMEOUT_IN_SECONDS')
         trl.save()
+        # usage_rollup
+        rollup = TaskTimeoutTracker.objects.filter(name=os.getenv('ROLLUP_NAME')).first()
+        if not rollup:
+            rollup = TaskTimeoutTracker(
+                description=os.getenv('ROLLUP_DESCRIPTION'),
+                last_updated=(now - timedelta(seconds=(int(os.getenv('ROLLUP_TIMEOUT_IN_SECONDS')) + 1))),
+                name=os.getenv('ROLLUP_NAME'),
+                timeout_in_seconds=int(os.getenv('ROLLUP_TIMEOUT_IN_SECONDS')),
+                uuid=str(uuid4()),
+                value=None
+            )
+        else:
+            rollup.description = os.getenv('ROLLUP_DESCRIPTION')
+            rollup.name = os.getenv('ROLLUP_NAME')
+            rollup.timeout_in_seconds = os.getenv('ROLLUP_TIMEOUT_IN_SECONDS')
+        rollup.save()
     except Exception as exc:
         print(exc)
 
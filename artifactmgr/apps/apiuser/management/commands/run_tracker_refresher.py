@@ -0,0 +1,79 @@
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from artifactmgr.apps.apiuser.models import TaskTimeoutTracker
+from artifactmgr.utils.fabric_auth import refresh_public_signing_key, refresh_token_revocation_list
+from artifactmgr.utils.usage_rollup import refresh_usage_rollup
+
+
+def tracker_lock_id(name: str) -> int:
+    """
+    Stable 64-bit PostgreSQL advisory lock id for a TaskTimeoutTracker name
+    """
+    return int.from_bytes(hashlib.sha256('task_timeout_tracker:{0}'.format(name).encode()).digest()[:8],
+                          byteorder='big', signed=True)
+
+
+def refresh_trackers(lead_in_seconds: int) -> None:
+    """
+    Refresh TaskTimeoutTracker values that time out within lead_in_seconds
+    - public_signing_key
+    - token_revocation_list
+    - usage_rollup (rolls up view / download events into the daily usage tables)
+    - author_refresh_check holds no value and is not refreshed here
+    Each refresh is guarded by a PostgreSQL advisory lock so only one node in the cluster fetches from credmgr
+    """
+    refreshers = [
+        (os.getenv('PSK_NAME'), refresh_public_signing_key),
+        (os.getenv('TRL_NAME'), refresh_token_revocation_list),
+        (os.getenv('ROLLUP_NAME'), refresh_usage_rollup),
+    ]
+    for name, refresh in refreshers:
+        lock_id = tracker_lock_id(name)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_id])
+            if not cursor.fetchone()[0]:
+                continue
+            try:
+                # re-read under the lock: another node may have just refreshed this tracker
+                tracker = TaskTimeoutTracker.objects.get(name=name)
+                refresh_at = tracker.last_updated + timedelta(
+                    seconds=int(tracker.timeout_in_seconds) - lead_in_seconds)
+                if not tracker.value or datetime.now(timezone.utc) >= refresh_at:
+                    refresh(tracker)
+                    print('refreshed: {0}'.format(name))
+            except Exception as exc:
+                print(exc)
+            finally:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
+
+
+class Command(BaseCommand):
+    help = 'Refresh TaskTimeoutTracker entries (public signing key, token revocation list, usage rollup) ' \
+           'before they time out'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=int(os.getenv('TRACKER_REFRESHER_INTERVAL_SECONDS', 30)),
+                            help='seconds to sleep between refresh checks')
+        parser.add_argument('--lead', type=int, default=int(os.getenv('TRACKER_REFRESHER_LEAD_SECONDS', 60)),
+                            help='refresh a tracker this many seconds before it times out')
+        parser.add_argument('--once', action='store_true', help='run a single refresh check and exit')
+
+    def handle(self, *args, **kwargs):
+        try:
+            while True:
+                close_old_connections()
+                refresh_trackers(lead_in_seconds=kwargs.get('lead'))
+                if kwargs.get('once'):
+                    break
+                time.sleep(kwargs.get('interval'))
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            print(e)
+            raise CommandError('Tracker refresh failed.')
@@ -0,0 +1,20 @@
+from artifactmgr.server.settings import API_DEBUG
+
+
+class ApiUserMiddleware:
+    """
+    Request-scoped ApiUser resolution
+    - get_api_user(request) resolves the ApiUser on first use and caches it on the HttpRequest, so every viewset,
+      validator and form that calls it for the same request reuses that ApiUser
+    - API_DEBUG: the X-Api-User-Resolutions response header reports how many times resolution ran (expected: 0 or 1)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.api_user_resolutions = 0
+        response = self.get_response(request)
+        if API_DEBUG:
+            response.headers['X-Api-User-Resolutions'] = str(request.api_user_resolutions)
+        return response
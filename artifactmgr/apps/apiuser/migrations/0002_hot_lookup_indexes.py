@@ -0,0 +1,48 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:36
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def dedupe_unique_columns(apps, schema_editor):
+    """
+    Remove duplicate rows before the unique constraints are added
+    - ApiUser.uuid - keep the most recently refreshed row (latest access_expires, then highest id)
+    - TaskTimeoutTracker.name - keep the most recently updated row
+    """
+    ApiUser = apps.get_model('apiuser', 'ApiUser')
+    TaskTimeoutTracker = apps.get_model('apiuser', 'TaskTimeoutTracker')
+    duplicates = ApiUser.objects.values('uuid').annotate(rows=Count('id')).filter(rows__gt=1)
+    for uuid in duplicates.values_list('uuid', flat=True):
+        keep = ApiUser.objects.filter(uuid=uuid).order_by(F('access_expires').desc(nulls_last=True), '-id').first()
+        ApiUser.objects.filter(uuid=uuid).exclude(pk=keep.pk).delete()
+    duplicates = TaskTimeoutTracker.objects.values('name').annotate(rows=Count('uuid')).filter(rows__gt=1)
+    for name in duplicates.values_list('name', flat=True):
+        keep = TaskTimeoutTracker.objects.filter(name=name).order_by('-last_updated').first()
+        TaskTimeoutTracker.objects.filter(name=name).exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiuser', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_unique_columns, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='apiuser',
+            name='cilogon_id',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='apiuser',
+            name='uuid',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='tasktimeouttracker',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -22,12 +22,12 @@ class ApiUser(models.Model):
         max_length=24, choices=ACCESS_TYPE_CHOICES, default=COOKIE
     )
     affiliation = models.CharField(max_length=255, blank=True, null=True)
-    cilogon_id = models.CharField(max_length=255, blank=False, null=False)
+    cilogon_id = models.CharField(max_length=255, blank=False, null=False, db_index=True)
     email = models.CharField(max_length=255, blank=True, null=True)
     fabric_roles = ArrayField(models.CharField(max_length=255, blank=True))
     name = models.CharField(max_length=255, blank=True, null=True)
     projects = ArrayField(models.CharField(max_length=255, blank=True))
-    uuid = models.CharField(primary_key=False, max_length=255, blank=False)
+    uuid = models.CharField(primary_key=False, max_length=255, blank=False, unique=True)
 
     @property
     def can_create_artifact(self):
@@ -76,7 +76,7 @@ class TaskTimeoutTracker(models.Model):
     """
     description = models.CharField(max_length=255, blank=True, null=True)
     last_updated = models.DateTimeField(blank=False, null=False)
-    name = models.CharField(max_length=255, blank=False, null=False)
+    name = models.CharField(max_length=255, blank=False, null=False, unique=True)
     timeout_in_seconds = models.IntegerField(default=0, blank=False, null=False)
     uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
     value = models.TextField(blank=True, null=True)
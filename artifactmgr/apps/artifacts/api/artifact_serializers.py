@@ -1,8 +1,9 @@
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from artifactmgr.apps.artifacts.api.author_serializers import AuthorSerializer
 from artifactmgr.apps.artifacts.api.version_serializers import ArtifactVersionSerializer
-from artifactmgr.apps.artifacts.models import Artifact, ArtifactVersion
+from artifactmgr.apps.artifacts.models import Artifact
 
 
 class ArtifactSerializer(serializers.ModelSerializer):
@@ -21,20 +22,28 @@ class ArtifactSerializer(serializers.ModelSerializer):
     - project_uuid = models.CharField(max_length=255, blank=True, null=True)
     - tags = models.ManyToManyField(ArtifactTag, related_name="artifact_tags", blank=True)
     - title = models.CharField(max_length=255, blank=False, null=False)
+    - unique_downloaders = models.IntegerField(default=0) - HyperLogLog estimate
+    - unique_viewers = models.IntegerField(default=0) - HyperLogLog estimate
     - versions
     - visibility = models.CharField(max_length=24, choices=VISIBILITY_CHOICES, default=AUTHOR)
     - uuid = models.CharField(max_length=255, blank=False, null=False)
+    Redaction: authors (show_authors=False) and project_name / project_uuid (show_project=False) are only
+    serialized for authors of the artifact; the viewer is context['api_user_uuid'], checked against the
+    prefetched authors
+    Search: results of a ?search=...&headline=true query also carry search_headline (highlighted snippet)
     """
     artifact_downloads_active = serializers.SerializerMethodField(method_name='get_artifact_downloads_active')
     artifact_downloads_retired = serializers.SerializerMethodField(method_name='get_artifact_downloads_retired')
     artifact_views = serializers.SerializerMethodField(method_name='get_artifact_views')
-    authors = AuthorSerializer(many=True)
+    authors = serializers.SerializerMethodField(method_name='get_authors')
     created = serializers.SerializerMethodField(method_name='get_created')
     created_by = AuthorSerializer(instance='created_by')
     lookup_field = 'uuid'
     modified = serializers.SerializerMethodField(method_name='get_modified')
     modified_by = AuthorSerializer(instance='modified_by')
     number_of_versions = serializers.SerializerMethodField(method_name='get_number_of_versions')
+    project_name = serializers.SerializerMethodField(method_name='get_project_name')
+    project_uuid = serializers.SerializerMethodField(method_name='get_project_uuid')
     tags = serializers.SerializerMethodField(method_name='get_tags')
     versions = ArtifactVersionSerializer(source='artifact_version', many=True)
 
@@ -43,34 +52,35 @@ class ArtifactSerializer(serializers.ModelSerializer):
         fields = ['artifact_downloads_active', 'artifact_downloads_retired', 'artifact_views', 'authors', 'created',
                   'created_by', 'deleted', 'deleted_at','description_long',
                   'description_short', 'modified', 'modified_by', 'number_of_versions', 'project_name',
-                  'project_uuid', 'show_authors', 'show_project', 'tags', 'title', 'versions',
-                  'visibility', 'uuid']
+                  'project_uuid', 'show_authors', 'show_project', 'tags', 'title', 'unique_downloaders',
+                  'unique_viewers', 'versions', 'visibility', 'uuid']
 
     @staticmethod
     def get_artifact_downloads_active(self) -> int:
-        downloads = []
-        versions = ArtifactVersion.objects.filter(
-            artifact_id=self.uuid,
-            active=True
-        ).all()
-        for version in versions:
-            downloads.append(version.version_downloads.count())
-        return sum(downloads)
+        return self.downloads_active
 
     @staticmethod
     def get_artifact_downloads_retired(self) -> int:
-        downloads = []
-        versions = ArtifactVersion.objects.filter(
-            artifact_id=self.uuid,
-            active=False
-        ).all()
-        for version in versions:
-            downloads.append(version.version_downloads.count())
-        return sum(downloads)
+        return self.downloads_retired
 
     @staticmethod
     def get_artifact_views(self) -> int:
-        return Artifact.objects.get(uuid=self.uuid).artifact_views.count()
+        return self.view_count
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'search_headline'):
+            data['search_headline'] = instance.search_headline
+        return data
+
+    def _viewer_is_author(self, artifact: Artifact) -> bool:
+        return artifact.is_author(api_user_uuid=self.context.get('api_user_uuid'))
+
+    @extend_schema_field(AuthorSerializer(many=True))
+    def get_authors(self, artifact: Artifact) -> list:
+        if not artifact.show_authors and not self._viewer_is_author(artifact):
+            return []
+        return AuthorSerializer(artifact.authors.all(), many=True).data
 
     @staticmethod
     def get_created(self) -> str:
@@ -81,15 +91,22 @@ class ArtifactSerializer(serializers.ModelSerializer):
         return str(self.modified.isoformat(' '))
 
     @staticmethod
-    def get_number_of_versions(self) -> list:
-        return ArtifactVersion.objects.filter(
-            artifact_id=self.uuid,
-            active=True
-        ).count()
+    def get_number_of_versions(self) -> int:
+        return len([v for v in self.artifact_version.all() if v.active])
+
+    def get_project_name(self, artifact: Artifact) -> str | None:
+        if not artifact.show_project and not self._viewer_is_author(artifact):
+            return None
+        return artifact.project_name
+
+    def get_project_uuid(self, artifact: Artifact) -> str | None:
+        if not artifact.show_project and not self._viewer_is_author(artifact):
+            return None
+        return artifact.project_uuid
 
     @staticmethod
     def get_tags(self) -> list:
-        return list(Artifact.objects.get(uuid=self.uuid).tags.values_list('tag', flat=True))
+        return [t.tag for t in self.tags.all()]
 
 
 class ArtifactCreateSerializer(serializers.ModelSerializer):
@@ -114,7 +131,7 @@ class ArtifactCreateSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_tags(self) -> list:
-        return list(Artifact.objects.get(uuid=self.uuid).tags.values_list('tag', flat=True))
+        return [t.tag for t in self.tags.all()]
 
 
 class ArtifactUpdateSerializer(serializers.ModelSerializer):
@@ -138,4 +155,4 @@ class ArtifactUpdateSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_tags(self) -> list:
-        return list(Artifact.objects.get(uuid=self.uuid).tags.values_list('tag', flat=True))
+        return [t.tag for t in self.tags.all()]
@@ -1,33 +1,62 @@
 import os
 from datetime import datetime, timezone
+from functools import partial
 from uuid import uuid4
 
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Sum
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import filters, permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 
-from artifactmgr.apps.apiuser.models import ApiUser
 from artifactmgr.apps.artifacts.api.artifact_serializers import ArtifactCreateSerializer, ArtifactSerializer, \
     ArtifactUpdateSerializer
-from artifactmgr.apps.artifacts.api.author_viewsets import create_author_from_uuid
+from artifactmgr.apps.artifacts.api.author_viewsets import authors_from_resolution, resolve_authors
+from artifactmgr.apps.artifacts.api.pagination import PageNumberOrCursorPagination
+from artifactmgr.apps.artifacts.api.stats_viewsets import add_unique_counts, get_stats_params, get_usage_series, \
+    STATS_PARAMETERS
 from artifactmgr.apps.artifacts.api.validators import validate_artifact_create, validate_artifact_update
-from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactViews
-from artifactmgr.utils.core_api import query_core_api_by_cookie, query_core_api_by_token
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactDailyUsage, VersionDailyUsage
+from artifactmgr.utils.artifact_search import search_artifacts
+from artifactmgr.utils.conditional_get import artifact_validators, conditional_response, list_validators, \
+    principals_class
+from artifactmgr.utils.core_api import lookup_fabric_project
 from artifactmgr.utils.fabric_auth import get_api_user
+from artifactmgr.utils.usage_events import record_artifact_view
 
 
 class DynamicSearchFilter(filters.SearchFilter):
-    def get_search_fields(self, view, request):
-        if request.parser_context.get('view').action in ('list', 'by_author', 'by_project'):
-            return ['title', 'project_name', 'tags__tag']
-        else:
+    """
+    Full-text search (artifactmgr.utils.artifact_search) for the artifact list views
+    - search - websearch syntax over title, descriptions, tags and project name, ordered by rank
+    - headline=true - add a highlighted search_headline snippet to each result
+    """
+    search_actions = ('list', 'by_author', 'by_project')
+
+    def filter_queryset(self, request, queryset, view):
+        search = request.query_params.get(self.search_param, '').strip()
+        if not search or view.action not in self.search_actions:
+            return queryset
+        return search_artifacts(
+            queryset, search=search, headline=str(request.query_params.get('headline')).casefold() == 'true')
+
+    def get_schema_operation_parameters(self, view):
+        if view.action not in self.search_actions:
             return []
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': 'headline',
+                'required': False,
+                'in': 'query',
+                'description': 'true: include a highlighted search_headline snippet with search results',
+                'schema': {'type': 'boolean'},
+            }
+        ]
 
 
 class ArtifactViewSet(viewsets.ModelViewSet):
@@ -52,61 +81,50 @@ class ArtifactViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     filter_backends = [DynamicSearchFilter]
     lookup_field = 'uuid'
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-modified', '-uuid')
 
     def get_queryset(self):
         api_user = get_api_user(request=self.request)
         if self.kwargs.get('author_uuid', None):
-            return Artifact.objects.filter(
-                authors__uuid__in=[self.kwargs.get('author_uuid')]
-            ).filter(
-                Q(visibility=Artifact.PUBLIC) |
-                Q(project_uuid__in=api_user.projects) |
-                Q(authors__uuid__in=[api_user.uuid])
-            ).distinct().order_by('-modified')
+            return Artifact.objects.authored_by(
+                self.kwargs.get('author_uuid')
+            ).visible_to(api_user).with_serializer_data().order_by('-modified', '-uuid')
         elif self.kwargs.get('filter_project_uuid', None):
             return Artifact.objects.filter(
                 project_uuid=self.kwargs.get('filter_project_uuid')
-            ).filter(
-                Q(visibility=Artifact.PUBLIC) |
-                Q(project_uuid__in=api_user.projects) |
-                Q(authors__uuid__in=[api_user.uuid])
-            ).distinct().order_by('-modified')
+            ).visible_to(api_user).with_serializer_data().order_by('-modified', '-uuid')
         else:
-            return Artifact.objects.filter(
-                Q(visibility=Artifact.PUBLIC) |
-                Q(project_uuid__in=api_user.projects) |
-                Q(authors__uuid__contains=api_user.uuid)
-            ).distinct().order_by('-modified')
+            return Artifact.objects.visible_to(api_user).with_serializer_data().order_by('-modified', '-uuid')
 
     def get_serializer_class(self):
         return self.serializer_classes.get(self.action, self.default_serializer_class)
 
-    def _redact_hidden_fields(self, response_artifacts, api_user):
-        """Apply show_authors / show_project redaction to a paginated list response."""
-        try:
-            for i in range(len(response_artifacts.data.get('results'))):
-                show_authors = response_artifacts.data.get('results')[i].get('show_authors')
-                show_project = response_artifacts.data.get('results')[i].get('show_project')
-                if not show_authors or not show_project:
-                    artifact = Artifact.objects.get(uuid=response_artifacts.data.get('results')[i].get('uuid'))
-                    if artifact:
-                        if not show_authors and not artifact.is_author(api_user_uuid=api_user.uuid):
-                            response_artifacts.data['results'][i]['authors'] = []
-                        if not show_project and not artifact.is_author(api_user_uuid=api_user.uuid):
-                            response_artifacts.data['results'][i]['project_name'] = None
-                            response_artifacts.data['results'][i]['project_uuid'] = None
-        except Exception as exc:
-            print(exc)
-        return response_artifacts
+    def get_serializer_context(self):
+        """
+        ArtifactSerializer redacts hidden authors / project for viewers that are not authors of the artifact
+        """
+        context = super().get_serializer_context()
+        context['api_user_uuid'] = get_api_user(request=self.request).uuid
+        return context
 
     def list(self, request, *args, **kwargs):
         """
         FABRIC Artifacts - list view
         - Search by 'title', 'project_name'
+        - Conditional GET: ETag of the artifacts visible to the user, 304 on If-None-Match match
+        """
+        return self._conditional_list(request, *args, **kwargs)
+
+    def _conditional_list(self, request, *args, **kwargs):
+        """
+        Paginated list wrapped in conditional GET (list, by_author, by_project): the ETag is keyed on the
+        CatalogVersion stamp, the viewer's visibility class and the request path
         """
         api_user = get_api_user(request=request)
-        response_artifacts = super().list(request, *args, **kwargs)
-        return self._redact_hidden_fields(response_artifacts, api_user)
+        validators = list_validators(viewer_class=principals_class(api_user), request_path=request.get_full_path())
+        return conditional_response(request, api_user=api_user, validators=validators,
+                                    build=partial(super().list, request, *args, **kwargs))
 
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -116,15 +134,20 @@ class ArtifactViewSet(viewsets.ModelViewSet):
         """
         api_user = get_api_user(request=request)
         if api_user.can_create_artifact:
-            is_valid, message = validate_artifact_create(request, api_user=api_user)
+            # resolve all authors (and the creator) concurrently, once, for both the validator and the save
+            resolved_authors = resolve_authors(
+                request=request, api_user=api_user,
+                author_uuids=set(request.data.get('authors', [])).union([api_user.uuid]))
+            is_valid, message = validate_artifact_create(request, api_user=api_user, resolved_authors=resolved_authors)
             if is_valid:
                 now = datetime.now(timezone.utc)
                 request_data = request.data
+                author_map = authors_from_resolution(resolved_authors)
                 artifact = Artifact()
                 # created
                 artifact.created = now
                 # created_by
-                created_by = create_author_from_uuid(request=request, api_user=api_user, author_uuid=api_user.uuid)
+                created_by = author_map.get(api_user.uuid)
                 if created_by:
                     artifact.created_by = created_by
                 # deleted
@@ -143,16 +166,9 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                 # project_uuid
                 project_uuid = request_data.get('project_uuid', None)
                 if project_uuid:
-                    # verify project exists and that api_user is member
-                    if api_user.access_type == ApiUser.COOKIE:
-                        fab_project = query_core_api_by_cookie(
-                            query='/projects/{0}'.format(project_uuid),
-                            cookie=request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None))
-                    else:
-                        fab_project = query_core_api_by_token(
-                            query='/projects/{0}'.format(project_uuid),
-                            token=request.headers.get('authorization', 'Bearer ').replace('Bearer ', ''))
-                    artifact.project_name = fab_project.get('results')[0].get('name', None)
+                    # project was verified by the validator; reuse its (cached) lookup
+                    fab_project = lookup_fabric_project(request=request, api_user=api_user, uuid=project_uuid) or {}
+                    artifact.project_name = fab_project.get('name', None)
                     artifact.project_uuid = project_uuid
                 # show_authors
                 if request_data.get('show_authors', None):
@@ -179,18 +195,15 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                 authors = request_data.get('authors', [])
                 authors.append(api_user.uuid)
                 authors = list(set(authors))
-                for author_uuid in authors:
-                    author = create_author_from_uuid(request=request, api_user=api_user, author_uuid=author_uuid)
-                    if author:
-                        artifact.authors.add(author)
+                artifact.authors.add(*[author_map.get(a) for a in authors if author_map.get(a)])
                 # tags
                 tags = request_data.get('tags', [])
-                for tag in tags:
-                    artifact.tags.add(tag)
+                if tags:
+                    artifact.tags.add(*tags)
                 artifact.save()
                 # TODO: check for attached version
                 # return new artifact
-                return Response(data=ArtifactSerializer(instance=artifact).data, status=201)
+                return Response(data=ArtifactSerializer(instance=artifact, context=self.get_serializer_context()).data, status=201)
             else:
                 raise ValidationError(detail={'ValidationError': message})
         else:
@@ -200,30 +213,19 @@ class ArtifactViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """
         FABRIC Artifacts - detailed view
+        - Conditional GET: ETag / Last-Modified, 304 on If-None-Match match (ETag differs for authors and readers)
+        - usage counters are not part of the ETag: the view recorded for this request does not invalidate it
         """
-        # increment artifact_views
         api_user = get_api_user(request=request)
-        try:
-            artifact = get_object_or_404(Artifact, uuid=self.kwargs.get('uuid'))
-            # view count can only be incremented by non-authors of the artifact
-            if api_user.uuid not in [a.uuid for a in artifact.authors.all()]:
-                artifact_view = ArtifactViews(viewed_by=str(api_user.uuid))
-                artifact_view.save()
-                artifact.artifact_views.add(artifact_view)
-                artifact.save()
-        except Exception as exc:
-            artifact = None
-            print(exc)
-        response_artifact = super().retrieve(request, *args, **kwargs)
-        show_authors = response_artifact.data.get('show_authors')
-        show_project = response_artifact.data.get('show_project')
-        if artifact:
-            if not show_authors and not artifact.is_author(api_user_uuid=api_user.uuid):
-                response_artifact.data['authors'] = []
-            if not show_project and not artifact.is_author(api_user_uuid=api_user.uuid):
-                response_artifact.data['project_name'] = None
-                response_artifact.data['project_uuid'] = None
-        return response_artifact
+        artifact_uuid = kwargs.get('uuid')
+        is_author = Artifact.objects.authored_by(api_user.uuid).filter(uuid=artifact_uuid).exists()
+        validators = artifact_validators(self.get_queryset().filter(uuid=artifact_uuid),
+                                         viewer_class='author' if is_author else 'reader')
+        # view count can only be incremented by non-authors of the artifact (not modified responses are views too)
+        if validators and not is_author:
+            record_artifact_view(artifact_uuid=artifact_uuid, viewed_by=str(api_user.uuid))
+        return conditional_response(request, api_user=api_user, validators=validators,
+                                    build=lambda: Response(data=self.get_serializer(self.get_object()).data))
 
     @transaction.atomic
     def update(self, request, *args, **kwargs):
@@ -233,11 +235,18 @@ class ArtifactViewSet(viewsets.ModelViewSet):
         """
         artifact = get_object_or_404(Artifact, uuid=kwargs.get('uuid'))
         api_user = get_api_user(request=request)
-        if api_user.uuid in [a.uuid for a in artifact.authors.all()]:
-            is_valid, message = validate_artifact_update(request, api_user=api_user)
+        authors_orig = [a.uuid for a in artifact.authors.all()]
+        if api_user.uuid in authors_orig:
+            # resolve added authors (and the modifier) concurrently, once, for both the validator and the save
+            resolved_authors = resolve_authors(
+                request=request, api_user=api_user,
+                author_uuids=set(request.data.get('authors', None) or []).difference(authors_orig).union(
+                    [api_user.uuid]))
+            is_valid, message = validate_artifact_update(request, api_user=api_user, resolved_authors=resolved_authors)
             if is_valid:
                 now = datetime.now(timezone.utc)
                 request_data = request.data
+                author_map = authors_from_resolution(resolved_authors)
                 # description_long
                 if request_data.get('description_long', None):
                     artifact.description_long = request_data.get('description_long', None)
@@ -246,7 +255,7 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                     artifact.description_short = request_data.get('description_short', '')
                 # modified
                 artifact.modified = now
-                modified_by = create_author_from_uuid(request=request, api_user=api_user, author_uuid=api_user.uuid)
+                modified_by = author_map.get(api_user.uuid)
                 # modified_by
                 if modified_by:
                     artifact.modified_by = modified_by
@@ -255,16 +264,9 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                 if request_data.get('project_uuid', None):
                     project_uuid = request_data.get('project_uuid', None)
                     if project_uuid:
-                        # verify project exists and that api_user is member
-                        if api_user.access_type == ApiUser.COOKIE:
-                            fab_project = query_core_api_by_cookie(
-                                query='/projects/{0}'.format(project_uuid),
-                                cookie=request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None))
-                        else:
-                            fab_project = query_core_api_by_token(
-                                query='/projects/{0}'.format(project_uuid),
-                                token=request.headers.get('authorization', 'Bearer ').replace('Bearer ', ''))
-                        artifact.project_name = fab_project.get('results')[0].get('name', None)
+                        # project was verified by the validator; reuse its (cached) lookup
+                        fab_project = lookup_fabric_project(request=request, api_user=api_user, uuid=project_uuid) or {}
+                        artifact.project_name = fab_project.get('name', None)
                         artifact.project_uuid = project_uuid
                 # show_authors
                 show_authors = str(request_data.get('show_authors', None))
@@ -288,17 +290,11 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                 if request_data.get('authors', None):
                     authors = request_data.get('authors', None)
                     authors = list(set(authors))
-                    authors_orig = [a.uuid for a in artifact.authors.all()]
                     authors_added = list(set(authors).difference(set(authors_orig)))
                     authors_removed = list(set(authors_orig).difference(set(authors)))
-                    for author_uuid in authors_added:
-                        author = create_author_from_uuid(request=request, api_user=api_user, author_uuid=author_uuid)
-                        if author:
-                            artifact.authors.add(author)
-                    for author_uuid in authors_removed:
-                        author = ArtifactAuthor.objects.filter(uuid=author_uuid).first()
-                        if author:
-                            artifact.authors.remove(author)
+                    artifact.authors.add(*[author_map.get(a) for a in authors_added if author_map.get(a)])
+                    if authors_removed:
+                        artifact.authors.remove(*ArtifactAuthor.objects.filter(uuid__in=authors_removed))
                 # tags
                 tags = request_data.get('tags', [])
                 tags_orig = [t.tag for t in artifact.tags.all()]
@@ -308,14 +304,17 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                         tags.append(t.tag)
                 tags_added = list(set(tags).difference(set(tags_orig)))
                 tags_removed = list(set(tags_orig).difference(set(tags)))
-                for tag in tags_added:
-                    artifact.tags.add(tag)
-                for tag in tags_removed:
-                    artifact.tags.remove(tag)
-                # save artifact
-                artifact.save()
+                if tags_added:
+                    artifact.tags.add(*tags_added)
+                if tags_removed:
+                    artifact.tags.remove(*tags_removed)
+                # save artifact (edited fields only: counters are maintained with F() updates)
+                artifact.save(update_fields=[
+                    'description_long', 'description_short', 'modified', 'modified_by', 'project_name', 'project_uuid',
+                    'show_authors', 'show_project', 'title', 'visibility'
+                ])
                 # return updated artifact
-                return Response(data=ArtifactSerializer(instance=artifact).data, status=200)
+                return Response(data=ArtifactSerializer(instance=artifact, context=self.get_serializer_context()).data, status=200)
             else:
                 raise ValidationError(detail={'ValidationError': message})
         else:
@@ -349,12 +348,39 @@ class ArtifactViewSet(viewsets.ModelViewSet):
                 detail="PermissionDenied: user:'{0}' is unable to delete /artifacts/{1}".format(api_user.uuid,
                                                                                                 kwargs.get('uuid')))
 
+    @extend_schema(parameters=STATS_PARAMETERS, responses=OpenApiTypes.OBJECT)
+    @action(detail=True, methods=['get'])
+    def stats(self, request, *args, **kwargs) -> HttpResponse | ValidationError:
+        """
+        FABRIC Artifacts - usage statistics
+        - Views and downloads over time, served from the daily rollups (manage.py rollup_usage)
+        - unique_viewers / unique_downloaders are HyperLogLog estimates merged from the daily sketches
+        - Must be able to view the artifact
+        """
+        artifact = get_object_or_404(self.get_queryset().prefetch_related(None), uuid=kwargs.get('uuid'))
+        start, end, granularity = get_stats_params(request)
+        usage = ArtifactDailyUsage.objects.filter(artifact_id=artifact.uuid)
+        data = get_usage_series(usage, start=start, end=end, granularity=granularity)
+        data = add_unique_counts(data, usage, start=start, end=end, granularity=granularity)
+        data['artifact'] = artifact.uuid
+        data['versions'] = [
+            {'uuid': row.get('version_id'), 'downloads': row.get('downloads')}
+            for row in VersionDailyUsage.objects.filter(
+                version__artifact_id=artifact.uuid, day__gte=start, day__lte=end
+            ).values('version_id').annotate(downloads=Sum('downloads')).order_by('-downloads', 'version_id')
+        ]
+        return Response(data=data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(name='search', type=str, location=OpenApiParameter.QUERY,
-                             description='Search artifacts by title, tag, or project name'),
+                             description='Full-text search (websearch syntax) over title, descriptions, tags and project name'),
             OpenApiParameter(name='page', type=int, location=OpenApiParameter.QUERY,
                              description='Page number for paginated results'),
+            OpenApiParameter(name='cursor', type=str, location=OpenApiParameter.QUERY,
+                             description='Cursor pagination (empty for the first page) instead of page numbers'),
+            OpenApiParameter(name='headline', type=bool, location=OpenApiParameter.QUERY,
+                             description='true: include a highlighted search_headline snippet with search results'),
         ]
     )
     @action(detail=False, methods=['get'], url_path='by-author/(?P<uuid>[^/.]+)')
@@ -363,22 +389,25 @@ class ArtifactViewSet(viewsets.ModelViewSet):
         FABRIC Artifacts - By Author
         - Retrieve artifacts by author where api_user can view them
         - get_queryset returns intersection of all artifacts by author x viewable artifacts by api_user
+        - Conditional GET: ETag of the listed artifacts, 304 on If-None-Match match
         """
-        api_user = get_api_user(request=request)
         author = ArtifactAuthor.objects.filter(uuid=kwargs.get('uuid')).first()
         if author:
             self.kwargs.update({'author_uuid': author.uuid})
         else:
             self.kwargs.update({'author_uuid': os.getenv('API_USER_ANON_UUID')})
-        response_artifacts = super().list(request, *args, **kwargs)
-        return self._redact_hidden_fields(response_artifacts, api_user)
+        return self._conditional_list(request, *args, **kwargs)
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name='search', type=str, location=OpenApiParameter.QUERY,
-                             description='Search artifacts by title, tag, or project name'),
+                             description='Full-text search (websearch syntax) over title, descriptions, tags and project name'),
             OpenApiParameter(name='page', type=int, location=OpenApiParameter.QUERY,
                              description='Page number for paginated results'),
+            OpenApiParameter(name='cursor', type=str, location=OpenApiParameter.QUERY,
+                             description='Cursor pagination (empty for the first page) instead of page numbers'),
+            OpenApiParameter(name='headline', type=bool, location=OpenApiParameter.QUERY,
+                             description='true: include a highlighted search_headline snippet with search results'),
         ]
     )
     @action(detail=False, methods=['get'], url_path='by-project/(?P<uuid>[^/.]+)')
@@ -387,8 +416,7 @@ class ArtifactViewSet(viewsets.ModelViewSet):
         FABRIC Artifacts - By Project
         - Retrieve artifacts by project_uuid where api_user can view them
         - get_queryset returns intersection of all artifacts in the project x viewable artifacts by api_user
+        - Conditional GET: ETag of the listed artifacts, 304 on If-None-Match match
         """
-        api_user = get_api_user(request=request)
         self.kwargs.update({'filter_project_uuid': kwargs.get('uuid')})
-        response_artifacts = super().list(request, *args, **kwargs)
-        return self._redact_hidden_fields(response_artifacts, api_user)
+        return self._conditional_list(request, *args, **kwargs)
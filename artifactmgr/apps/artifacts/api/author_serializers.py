@@ -16,3 +16,15 @@ class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = ArtifactAuthor
         fields = ['affiliation', 'email', 'name', 'uuid']
+
+
+class AuthorListSerializer(AuthorSerializer):
+    """
+    ArtifactAuthor with the number of their artifacts visible to the requesting user
+    - artifact_count - annotated by AuthorViewSet.get_queryset
+    """
+    artifact_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ArtifactAuthor
+        fields = ['affiliation', 'artifact_count', 'email', 'name', 'uuid']
@@ -1,14 +1,17 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+from django.db.models import Count, Q
 from rest_framework import filters, permissions, viewsets
 from rest_framework.exceptions import APIException, MethodNotAllowed
 
 from artifactmgr.apps.apiuser.models import ApiUser, TaskTimeoutTracker
-from artifactmgr.apps.artifacts.api.author_serializers import AuthorSerializer
-from artifactmgr.apps.artifacts.models import ArtifactAuthor
+from artifactmgr.apps.artifacts.api.author_serializers import AuthorListSerializer
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor
+from artifactmgr.utils.conditional_get import bump_catalog_version
 from artifactmgr.utils.core_api import PERSON_FOUND, PERSON_LOOKUP_FAILED, lookup_fabric_person
-from artifactmgr.utils.fabric_auth import is_valid_uuid
+from artifactmgr.utils.fabric_auth import get_api_user, is_valid_uuid
 
 
 class CoreApiUnavailable(APIException):
@@ -36,18 +39,30 @@ class AuthorViewSet(viewsets.ModelViewSet):
     - partial update (PATCH id)
     - destroy (DELETE id)
     """
-    serializer_class = AuthorSerializer
-    filter_backends = [DynamicSearchFilter]
+    serializer_class = AuthorListSerializer
+    filter_backends = [DynamicSearchFilter, filters.OrderingFilter]
+    ordering_fields = ['artifact_count', 'name']
+    ordering = ['name']
     permission_classes = [permissions.AllowAny]
     lookup_field = 'uuid'
 
     def get_queryset(self):
-        return ArtifactAuthor.objects.all().order_by('name')
+        """
+        Authors with artifact_count - the number of their artifacts visible to the user, as one grouped query
+        """
+        api_user = get_api_user(request=self.request)
+        return ArtifactAuthor.objects.annotate(
+            artifact_count=Count(
+                'artifact_author',
+                filter=Q(artifact_author__in=Artifact.objects.visible_to(api_user).values('pk'))
+            )
+        ).order_by('name')
 
     def list(self, request, *args, **kwargs):
         """
         FABRIC Artifact Authors
         - Search by 'name', 'email', 'affiliation'
+        - Order by 'name' (default) or 'artifact_count' ('-artifact_count' for most artifacts first)
         """
         return super().list(request, *args, **kwargs)
 
@@ -82,36 +97,89 @@ class AuthorViewSet(viewsets.ModelViewSet):
         raise MethodNotAllowed(method='DELETE', detail='MethodNotAllowed: DELETE /api/authors/{uuid}')
 
 
-def create_author_from_uuid(request, api_user: ApiUser, author_uuid: str) -> ArtifactAuthor | None:
-    try:
-        now = datetime.now(timezone.utc)
-        if not is_valid_uuid(author_uuid):
-            return None
-        author = ArtifactAuthor.objects.filter(uuid=author_uuid).first()
-        arc = TaskTimeoutTracker.objects.get(name=os.getenv('ARC_NAME'))
+def resolve_authors(request, api_user: ApiUser, author_uuids) -> dict:
+    """
+    Resolve a collection of author uuids in one pass
+    - authors refreshed within the author refresh check (ARC) timeout are used as stored
+    - stale or missing authors are looked up against core-api concurrently (AUTHOR_LOOKUP_MAX_WORKERS threads)
+    - found authors are upserted with a single bulk_create(update_conflicts=True)
+    Returns {uuid: (outcome, ArtifactAuthor | None)} for every valid uuid, where outcome is a lookup_fabric_person
+    outcome; a failed lookup keeps a (possibly stale) stored author if there is one
+    """
+    now = datetime.now(timezone.utc)
+    author_uuids = {author_uuid for author_uuid in author_uuids if is_valid_uuid(author_uuid)}
+    if not author_uuids:
+        return {}
+    arc = TaskTimeoutTracker.objects.get(name=os.getenv('ARC_NAME'))
+    known = ArtifactAuthor.objects.in_bulk(list(author_uuids))
+    resolved = {}
+    stale = []
+    for author_uuid in author_uuids:
+        author = known.get(author_uuid)
         if author and author.updated + timedelta(seconds=int(arc.timeout_in_seconds)) > now:
-            return author
-        outcome, person = lookup_fabric_person(request=request, api_user=api_user, uuid=author_uuid)
+            resolved[author_uuid] = (PERSON_FOUND, author)
+        else:
+            stale.append(author_uuid)
+    if not stale:
+        return resolved
+
+    def lookup(author_uuid: str) -> tuple:
+        return lookup_fabric_person(request=request, api_user=api_user, uuid=author_uuid)
+
+    if len(stale) == 1:
+        lookups = {stale[0]: lookup(stale[0])}
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(stale), int(os.getenv('AUTHOR_LOOKUP_MAX_WORKERS', 8)))) as pool:
+            lookups = dict(zip(stale, pool.map(lookup, stale)))
+    upserts = []
+    for author_uuid, (outcome, person) in lookups.items():
         if outcome == PERSON_FOUND:
-            if not author:
-                author = ArtifactAuthor()
-            author.affiliation = person.get('affiliation', None)
-            author.email = person.get('email', None)
-            author.name = person.get('name', None)
-            author.updated = now
-            author.uuid = person.get('uuid', None)
-            author.save()
-            return author
-        if outcome == PERSON_LOOKUP_FAILED:
-            # A failed/transient Core API call is not proof the user is missing. If we already
-            # hold a (possibly stale) record, use it so a known author never blocks the save;
-            # otherwise abort loudly rather than silently dropping the author.
-            if author:
-                return author
+            author = ArtifactAuthor(
+                affiliation=person.get('affiliation', None),
+                email=person.get('email', None),
+                name=person.get('name', None),
+                updated=now,
+                uuid=person.get('uuid', None)
+            )
+            upserts.append(author)
+            resolved[author_uuid] = (outcome, author)
+        elif outcome == PERSON_LOOKUP_FAILED:
+            resolved[author_uuid] = (outcome, known.get(author_uuid))
+        else:
+            resolved[author_uuid] = (outcome, None)
+    if upserts:
+        ArtifactAuthor.objects.bulk_create(
+            upserts,
+            update_conflicts=True,
+            unique_fields=['uuid'],
+            update_fields=['affiliation', 'email', 'name', 'updated']
+        )
+        # refreshed profiles are serialized with the artifacts (bulk_create sends no post_save)
+        bump_catalog_version()
+    return resolved
+
+
+def authors_from_resolution(resolved: dict) -> dict:
+    """
+    Map {uuid: ArtifactAuthor} from the result of resolve_authors
+    - PERSON_NOT_FOUND authors are dropped (genuinely no such user)
+    - a failed/transient Core API call is not proof the user is missing: a known (possibly stale) record is used
+      so it never blocks the save, otherwise abort loudly rather than silently dropping the author
+    """
+    authors = {}
+    for author_uuid, (outcome, author) in resolved.items():
+        if author:
+            authors[author_uuid] = author
+        elif outcome == PERSON_LOOKUP_FAILED:
             raise CoreApiUnavailable(
                 detail="unable to verify author '{0}' with the Core API; please retry".format(author_uuid))
-        # PERSON_NOT_FOUND: genuinely no such user
-        return None
+    return authors
+
+
+def create_author_from_uuid(request, api_user: ApiUser, author_uuid: str) -> ArtifactAuthor | None:
+    try:
+        resolved = resolve_authors(request=request, api_user=api_user, author_uuids=[author_uuid])
+        return authors_from_resolution(resolved).get(author_uuid)
     except CoreApiUnavailable:
         raise
     except Exception as exc:
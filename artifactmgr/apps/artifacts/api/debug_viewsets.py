@@ -0,0 +1,40 @@
+import os
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from artifactmgr.server.settings import API_DEBUG
+from artifactmgr.utils.fabric_auth import get_api_user, get_auth_cache_stats
+from artifactmgr.utils.http_client import get_http_client_metrics
+from artifactmgr.utils.usage_events import get_usage_buffer_stats
+
+
+class DebugViewSet(viewsets.ViewSet):
+    """
+    FABRIC Artifact Manager runtime metrics
+    - list (GET) - metrics of the worker that serves the request (API_DEBUG or artifact manager admins only)
+    """
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def list(self, request, *args, **kwargs):
+        """
+        FABRIC Artifact Manager runtime metrics (per worker process)
+        - auth_cache - verified bearer token and Vouch cookie caches: size, hits, misses, evictions, hit_rate
+        - http_client - upstream (core-api, credmgr) connection pool reuse and per-host latency
+        - usage_buffer - view / download event buffer: recorded, dropped, flushed, flushes, failed_flushes, pending
+        - Requires API_DEBUG=true or the artifact manager admins role
+        """
+        api_user = get_api_user(request=request)
+        if not API_DEBUG and not api_user.is_artifact_manager_admin:
+            raise PermissionDenied(
+                detail="PermissionDenied: user:'{0}' is unable to view /meta/debug".format(api_user.uuid))
+        return Response(data={
+            'auth_cache': get_auth_cache_stats(),
+            'http_client': get_http_client_metrics(),
+            'usage_buffer': get_usage_buffer_stats(),
+            'worker_pid': os.getpid()
+        })
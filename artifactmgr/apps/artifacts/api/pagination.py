@@ -0,0 +1,46 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ViewCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by the view's cursor_ordering (e.g. ('-modified', '-uuid'))
+    - the ordering must be unique and backed by a composite index so each page is an index range scan
+    """
+    ordering = ('-created', '-uuid')
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Page number pagination (default, ?page=) with an opt-in cursor mode (?cursor=)
+    - cursor mode: no COUNT(*) and no OFFSET, pages are keyed on view.cursor_ordering
+    - response: {next, previous, results} in cursor mode, {count, next, previous, results} otherwise
+    """
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = ViewCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view=view)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor pagination: pass an empty value for the first page, then follow next / previous',
+                'schema': {'type': 'string'},
+            }
+        ]
@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from artifactmgr.apps.artifacts.models import ProjectSummary
+
+
+class ProjectSerializer(serializers.ModelSerializer):
+    """
+    ProjectSummary
+    - artifact_count - annotated by ProjectViewSet.get_queryset (artifacts listed for the requesting user)
+    - last_modified - annotated by ProjectViewSet.get_queryset (most recent modification of those artifacts)
+    - name = models.CharField(max_length=255, blank=True, null=True)
+    - uuid = project_uuid
+    """
+    artifact_count = serializers.IntegerField(read_only=True)
+    last_modified = serializers.DateTimeField(read_only=True, allow_null=True)
+    uuid = serializers.CharField(source='project_uuid', read_only=True)
+
+    class Meta:
+        model = ProjectSummary
+        fields = ['artifact_count', 'last_modified', 'name', 'uuid']
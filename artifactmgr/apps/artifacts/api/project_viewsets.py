@@ -0,0 +1,43 @@
+from rest_framework import filters, permissions, viewsets
+
+from artifactmgr.apps.artifacts.api.project_serializers import ProjectSerializer
+from artifactmgr.utils.fabric_auth import get_api_user
+from artifactmgr.utils.project_summary import projects_visible_to
+
+
+class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    FABRIC Projects with artifacts (served from the materialized ProjectSummary catalog)
+    - list (GET) - paginated list of projects with artifacts listed for the user
+    - retrieve (GET uuid)
+    """
+    serializer_class = ProjectSerializer
+    search_fields = ['name']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    ordering_fields = ['artifact_count', 'last_modified', 'name']
+    ordering = ['name', 'project_uuid']
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'project_uuid'
+    lookup_url_kwarg = 'uuid'
+
+    def get_queryset(self):
+        """
+        Projects with artifact_count - the number of their artifacts visible to the user (and showing their project,
+        unless authored by the user) - and last_modified - the most recent modification among those artifacts
+        """
+        api_user = get_api_user(request=self.request)
+        return projects_visible_to(api_user).order_by('name', 'project_uuid')
+
+    def list(self, request, *args, **kwargs):
+        """
+        FABRIC Projects
+        - Search by 'name'
+        - Order by 'name' (default), 'artifact_count' or 'last_modified' ('-' prefix for descending)
+        """
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        retrieve (GET {uuid})
+        """
+        return super().retrieve(request, *args, **kwargs)
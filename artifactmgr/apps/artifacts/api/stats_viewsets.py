@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactDailyUsage
+from artifactmgr.utils.fabric_auth import get_api_user
+from artifactmgr.utils.hyperloglog import HyperLogLog
+
+STATS_GRANULARITY = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+STATS_PARAMETERS = [
+    OpenApiParameter(name='start', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                     description='First day (UTC, YYYY-MM-DD), defaults to 29 days before end'),
+    OpenApiParameter(name='end', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                     description='Last day (UTC, YYYY-MM-DD), defaults to today'),
+    OpenApiParameter(name='granularity', type=str, location=OpenApiParameter.QUERY, enum=list(STATS_GRANULARITY),
+                     description='Bucket size: day (default), week or month'),
+]
+
+
+def get_stats_params(request) -> tuple:
+    """
+    Parse the stats query parameters, returns (start, end, granularity)
+    - start, end - dates in UTC (inclusive), default: the 30 days up to today
+    - granularity - day, week or month, default: day
+    """
+    message = []
+    start = end = None
+    try:
+        end = date.fromisoformat(request.query_params.get('end')) if request.query_params.get('end') else \
+            datetime.now(timezone.utc).date()
+    except ValueError:
+        message.append({'end': 'invalid date: \'{0}\', must be YYYY-MM-DD'.format(request.query_params.get('end'))})
+    try:
+        start = date.fromisoformat(request.query_params.get('start')) if request.query_params.get('start') else \
+            (end or datetime.now(timezone.utc).date()) - timedelta(days=29)
+    except ValueError:
+        message.append(
+            {'start': 'invalid date: \'{0}\', must be YYYY-MM-DD'.format(request.query_params.get('start'))})
+    if start and end and start > end:
+        message.append({'start': 'start: \'{0}\' is after end: \'{1}\''.format(start, end)})
+    granularity = request.query_params.get('granularity', 'day')
+    if granularity not in STATS_GRANULARITY:
+        message.append({'granularity': 'invalid granularity: \'{0}\', must be one of {1}'.format(
+            granularity, ', '.join(STATS_GRANULARITY))})
+    if message:
+        raise ValidationError(detail={'ValidationError': message})
+    return start, end, granularity
+
+
+def get_usage_series(usage, start: date, end: date, granularity: str) -> dict:
+    """
+    Views and downloads from an ArtifactDailyUsage queryset, bucketed by granularity
+    """
+    rows = usage.filter(
+        day__gte=start, day__lte=end
+    ).annotate(
+        period=STATS_GRANULARITY.get(granularity)('day')
+    ).values('period').annotate(
+        views=Sum('views'), downloads=Sum('downloads')
+    ).order_by('period')
+    results = [
+        {'period': str(row.get('period')), 'views': row.get('views'), 'downloads': row.get('downloads')}
+        for row in rows
+    ]
+    return {
+        'start': str(start),
+        'end': str(end),
+        'granularity': granularity,
+        'totals': {
+            'views': sum(r.get('views') for r in results),
+            'downloads': sum(r.get('downloads') for r in results)
+        },
+        'results': results
+    }
+
+
+def get_period_start(day: date, granularity: str) -> date:
+    """
+    First day of the bucket containing day (weeks start on Monday, as date_trunc('week') in PostgreSQL)
+    """
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def add_unique_counts(data: dict, usage, start: date, end: date, granularity: str) -> dict:
+    """
+    Add unique_viewers / unique_downloaders to a get_usage_series result by merging the daily HyperLogLog sketches
+    """
+    periods = defaultdict(lambda: (HyperLogLog(), HyperLogLog()))
+    total_viewers, total_downloaders = HyperLogLog(), HyperLogLog()
+    for day, viewers_sketch, downloaders_sketch in usage.filter(day__gte=start, day__lte=end).values_list(
+            'day', 'viewers_sketch', 'downloaders_sketch'):
+        viewers, downloaders = periods[str(get_period_start(day, granularity))]
+        viewers.merge(viewers_sketch)
+        downloaders.merge(downloaders_sketch)
+        total_viewers.merge(viewers_sketch)
+        total_downloaders.merge(downloaders_sketch)
+    for result in data.get('results'):
+        viewers, downloaders = periods[result.get('period')]
+        result['unique_viewers'] = viewers.count()
+        result['unique_downloaders'] = downloaders.count()
+    data['totals']['unique_viewers'] = total_viewers.count()
+    data['totals']['unique_downloaders'] = total_downloaders.count()
+    return data
+
+
+class StatsViewSet(viewsets.ViewSet):
+    """
+    FABRIC Artifact usage statistics
+    - list (GET) - views and downloads across all artifacts visible to the user, from the daily rollups
+    """
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        parameters=STATS_PARAMETERS + [
+            OpenApiParameter(name='project_uuid', type=str, location=OpenApiParameter.QUERY,
+                             description='Only artifacts of this FABRIC project'),
+        ],
+        responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request, *args, **kwargs):
+        """
+        FABRIC Artifact usage statistics
+        - Served from the daily rollups (manage.py rollup_usage), not from the raw events
+        - Only artifacts visible to the user are counted
+        """
+        api_user = get_api_user(request=request)
+        start, end, granularity = get_stats_params(request)
+        visible_artifacts = Artifact.objects.visible_to(api_user)
+        project_uuid = request.query_params.get('project_uuid', None)
+        if project_uuid:
+            visible_artifacts = visible_artifacts.filter(project_uuid=project_uuid)
+        usage = ArtifactDailyUsage.objects.filter(artifact_id__in=visible_artifacts.values('uuid'))
+        data = get_usage_series(usage, start=start, end=end, granularity=granularity)
+        data['project_uuid'] = project_uuid
+        return Response(data=data)
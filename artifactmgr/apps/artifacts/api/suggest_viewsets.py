@@ -0,0 +1,101 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import CharField, F, FloatField, Q, Value
+from django.db.models.functions import Greatest
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactTag
+from artifactmgr.utils.fabric_auth import get_api_user
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_DEFAULT_LIMIT = 5
+SUGGEST_MAX_LIMIT = 20
+
+
+def _suggestions(queryset, q: str, suggest_type: str, key: str, label: str, detail, match: list, limit: int):
+    """
+    Top-limit rows of one type with a word similar to q in any of the match fields (the pg_trgm <% operator, served
+    by the gin_trgm_ops index on each field), ranked by the best word similarity
+    """
+    matches = Q()
+    for field in match:
+        matches |= Q(**{'{0}__trigram_word_similar'.format(field): q})
+    scores = [TrigramWordSimilarity(q, field, output_field=FloatField()) for field in match]
+    return queryset.filter(
+        matches
+    ).annotate(
+        suggest_type=Value(suggest_type, output_field=CharField()),
+        suggest_key=F(key),
+        suggest_label=F(label),
+        suggest_detail=detail,
+        suggest_score=Greatest(*scores) if len(scores) > 1 else scores[0],
+    ).values(
+        'suggest_type', 'suggest_key', 'suggest_label', 'suggest_detail', 'suggest_score'
+    ).order_by('-suggest_score', 'suggest_label')[:limit]
+
+
+def get_suggestions(api_user, q: str, limit: int) -> dict:
+    """
+    Typeahead suggestions for artifacts (visible to api_user), authors and tags in one UNION ALL query
+    """
+    rows = _suggestions(
+        Artifact.objects.visible_to(api_user), q=q, suggest_type='artifacts', key='uuid', label='title',
+        detail=Value(None, output_field=CharField()), match=['title'], limit=limit
+    ).union(
+        _suggestions(ArtifactAuthor.objects.all(), q=q, suggest_type='authors', key='uuid', label='name',
+                     detail=F('affiliation'), match=['name', 'affiliation'], limit=limit),
+        _suggestions(ArtifactTag.objects.all(), q=q, suggest_type='tags', key='tag', label='tag',
+                     detail=Value(None, output_field=CharField()), match=['tag'], limit=limit),
+        all=True
+    ).order_by()
+    suggestions = {'artifacts': [], 'authors': [], 'tags': []}
+    for row in rows:
+        suggestion = {'uuid': row.get('suggest_key'), 'title': row.get('suggest_label')}
+        if row.get('suggest_type') == 'authors':
+            suggestion = {'uuid': row.get('suggest_key'), 'name': row.get('suggest_label'),
+                          'affiliation': row.get('suggest_detail')}
+        elif row.get('suggest_type') == 'tags':
+            suggestion = {'tag': row.get('suggest_key')}
+        suggestions[row.get('suggest_type')].append(suggestion)
+    return suggestions
+
+
+class SuggestViewSet(viewsets.ViewSet):
+    """
+    FABRIC Artifact Manager typeahead
+    - list (GET) - top matches per type (artifacts, authors, tags) for a partial query
+    """
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='q', type=str, location=OpenApiParameter.QUERY, required=True,
+                             description='Partial text, at least {0} characters'.format(SUGGEST_MIN_LENGTH)),
+            OpenApiParameter(name='limit', type=int, location=OpenApiParameter.QUERY,
+                             description='Matches per type, default {0}, max {1}'.format(
+                                 SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT)),
+        ],
+        responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request, *args, **kwargs):
+        """
+        FABRIC Artifact Manager typeahead
+        - Artifacts by title (only those visible to the user), authors by name or affiliation, tags
+        - Word prefix and similar-word (typo tolerant) matches, best matches first
+        """
+        api_user = get_api_user(request=request)
+        q = request.query_params.get('q', '').strip()
+        message = []
+        if len(q) < SUGGEST_MIN_LENGTH:
+            message.append({'q': 'must be at least {0} characters'.format(SUGGEST_MIN_LENGTH)})
+        try:
+            limit = min(max(int(request.query_params.get('limit', SUGGEST_DEFAULT_LIMIT)), 1), SUGGEST_MAX_LIMIT)
+        except ValueError:
+            limit = None
+            message.append({'limit': 'invalid limit: \'{0}\''.format(request.query_params.get('limit'))})
+        if message:
+            raise ValidationError(detail={'ValidationError': message})
+        return Response(data=dict(q=q, **get_suggestions(api_user=api_user, q=q, limit=limit)))
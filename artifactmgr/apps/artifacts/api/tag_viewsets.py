@@ -1,3 +1,5 @@
+from functools import partial
+
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, viewsets
@@ -6,6 +8,7 @@ from rest_framework.response import Response
 
 from artifactmgr.apps.artifacts.api.tag_serializers import TagSerializer, TagUpdateSerializer
 from artifactmgr.apps.artifacts.models import ArtifactTag
+from artifactmgr.utils.conditional_get import conditional_response, tag_validators
 from artifactmgr.utils.fabric_auth import get_api_user
 
 
@@ -51,8 +54,14 @@ class TagViewSet(viewsets.ModelViewSet):
         - Used to Tag or label artifacts
         - Search by 'tag'
         - Tags may only be added or removed by FABRIC facility operators
+        - Conditional GET: ETag of the tags visible to the user, 304 on If-None-Match match
         """
-        return super().list(request, *args, **kwargs)
+        api_user = get_api_user(request=request)
+        validators = tag_validators(
+            self.get_queryset(), viewer_class='admin' if api_user.is_artifact_manager_admin else 'user',
+            request_path=request.get_full_path())
+        return conditional_response(request, api_user=api_user, validators=validators,
+                                    build=partial(super().list, request, *args, **kwargs))
 
     def create(self, request, *args, **kwargs):
         """
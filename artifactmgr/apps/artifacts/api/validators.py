@@ -2,13 +2,12 @@ import json
 import os
 
 from artifactmgr.apps.apiuser.models import ApiUser
+from artifactmgr.apps.artifacts.api.author_viewsets import resolve_authors
 from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactTag, ArtifactVersion
 from artifactmgr.utils.core_api import (
     PERSON_LOOKUP_FAILED,
     PERSON_NOT_FOUND,
-    lookup_fabric_person,
-    query_core_api_by_cookie,
-    query_core_api_by_token,
+    lookup_fabric_project,
 )
 from artifactmgr.utils.fabric_auth import is_valid_uuid
 
@@ -125,9 +124,10 @@ def validate_artifact_version_create(request, api_user: ApiUser) -> tuple:
         return True, None
 
 
-def validate_artifact_create(request, api_user: ApiUser) -> tuple:
+def validate_artifact_create(request, api_user: ApiUser, resolved_authors: dict = None) -> tuple:
     """
     POST /api/artifacts
+    - resolved_authors - result of resolve_authors() already computed by the caller (resolved here if not given)
     - 'authors': ['string'] - optional
     - 'description_long': 'string' - required
     - 'description_short': 'string' - optional
@@ -141,9 +141,11 @@ def validate_artifact_create(request, api_user: ApiUser) -> tuple:
         request_data = request.data
         # 'authors': ['string'] - optional
         authors = request_data.get('authors', [])
+        if resolved_authors is None:
+            resolved_authors = resolve_authors(request=request, api_user=api_user, author_uuids=authors)
         for author in authors:
             if is_valid_uuid(author):
-                outcome, _ = lookup_fabric_person(request=request, api_user=api_user, uuid=author)
+                outcome, _ = resolved_authors.get(author, (PERSON_LOOKUP_FAILED, None))
                 if outcome == PERSON_NOT_FOUND:
                     message.append({'authors': 'unable to find user: \'{0}\''.format(author)})
                 elif outcome == PERSON_LOOKUP_FAILED:
@@ -172,15 +174,7 @@ def validate_artifact_create(request, api_user: ApiUser) -> tuple:
         project_uuid = request_data.get('project_uuid', None)
         if project_uuid:
             # verify project exists and that api_user is member
-            if api_user.access_type == ApiUser.COOKIE:
-                fab_project = query_core_api_by_cookie(
-                    query='/projects/{0}'.format(project_uuid),
-                    cookie=request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None))
-            else:
-                fab_project = query_core_api_by_token(
-                    query='/projects/{0}'.format(project_uuid),
-                    token=request.headers.get('authorization', 'Bearer ').replace('Bearer ', ''))
-            if fab_project.get('size') != 1 or fab_project.get('status') != 200:
+            if not lookup_fabric_project(request=request, api_user=api_user, uuid=project_uuid):
                 message.append({'project_uuid': 'unable to find project: \'{0}\''.format(project_uuid)})
             if project_uuid not in api_user.projects:
                 message.append({'project_uuid': 'user is not member of project: \'{0}\''.format(project_uuid)})
@@ -212,9 +206,10 @@ def validate_artifact_create(request, api_user: ApiUser) -> tuple:
         return True, None
 
 
-def validate_artifact_update(request, api_user: ApiUser) -> tuple:
+def validate_artifact_update(request, api_user: ApiUser, resolved_authors: dict = None) -> tuple:
     """
     PUT/PATCH /api/artifacts/{uuid}
+    - resolved_authors - result of resolve_authors() already computed by the caller (resolved here if not given)
     - 'authors': ['string'] - optional
     - 'description_long': 'string' - required
     - 'description_short': 'string' - optional
@@ -228,14 +223,19 @@ def validate_artifact_update(request, api_user: ApiUser) -> tuple:
         request_data = request.data
         # 'authors': ['string'] - optional
         authors = request_data.get('authors', [])
+        # authors already known to the artifact-manager were validated when first
+        # added; skip the redundant live Core API lookup for them (also avoids a
+        # transient Core API failure on an existing author blocking the edit).
+        known_authors = set(ArtifactAuthor.objects.filter(
+            uuid__in=[a for a in authors if is_valid_uuid(a)]).values_list('uuid', flat=True))
+        if resolved_authors is None:
+            resolved_authors = resolve_authors(
+                request=request, api_user=api_user, author_uuids=set(authors).difference(known_authors))
         for author in authors:
             if is_valid_uuid(author):
-                # authors already known to the artifact-manager were validated when first
-                # added; skip the redundant live Core API lookup for them (also avoids a
-                # transient Core API failure on an existing author blocking the edit).
-                if ArtifactAuthor.objects.filter(uuid=author).exists():
+                if author in known_authors:
                     continue
-                outcome, _ = lookup_fabric_person(request=request, api_user=api_user, uuid=author)
+                outcome, _ = resolved_authors.get(author, (PERSON_LOOKUP_FAILED, None))
                 if outcome == PERSON_NOT_FOUND:
                     message.append({'authors': 'unable to find user: \'{0}\''.format(author)})
                 elif outcome == PERSON_LOOKUP_FAILED:
@@ -264,15 +264,7 @@ def validate_artifact_update(request, api_user: ApiUser) -> tuple:
         project_uuid = request_data.get('project_uuid', None)
         if project_uuid:
             # verify project exists and that api_user is member
-            if api_user.access_type == ApiUser.COOKIE:
-                fab_project = query_core_api_by_cookie(
-                    query='/projects/{0}'.format(project_uuid),
-                    cookie=request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None))
-            else:
-                fab_project = query_core_api_by_token(
-                    query='/projects/{0}'.format(project_uuid),
-                    token=request.headers.get('authorization', 'Bearer ').replace('Bearer ', ''))
-            if fab_project.get('size') != 1 or fab_project.get('status') != 200:
+            if not lookup_fabric_project(request=request, api_user=api_user, uuid=project_uuid):
                 message.append({'project_uuid': 'unable to find project: \'{0}\''.format(project_uuid)})
             if project_uuid not in api_user.projects:
                 message.append({'project_uuid': 'user is not member of project: \'{0}\''.format(project_uuid)})
@@ -21,6 +21,7 @@ class ArtifactVersionSerializer(serializers.ModelSerializer):
     - storage_id = models.CharField(max_length=255, blank=False, null=False)
     - storage_repo = models.CharField(max_length=255, blank=False, null=False)
     - storage_type = models.CharField(max_length=24, choices=STORAGE_TYPE_CHOICES, default=FABRIC)
+    - unique_downloaders = models.IntegerField(default=0) - HyperLogLog estimate
     - uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
     """
     version_downloads = serializers.SerializerMethodField(method_name='get_version_downloads')
@@ -30,11 +31,11 @@ class ArtifactVersionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ArtifactVersion
-        fields = ['active', 'created', 'urn', 'uuid', 'version', 'version_downloads']
+        fields = ['active', 'created', 'unique_downloaders', 'urn', 'uuid', 'version', 'version_downloads']
 
     @staticmethod
     def get_version_downloads(self) -> int:
-        return ArtifactVersion.objects.get(uuid=self.uuid).version_downloads.count()
+        return self.download_count
 
     @staticmethod
     def get_created(self) -> str:
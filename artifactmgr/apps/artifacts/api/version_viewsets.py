@@ -1,6 +1,8 @@
 import json
+from functools import partial
 
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Subquery
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
@@ -11,13 +13,17 @@ from rest_framework.exceptions import MethodNotAllowed, PermissionDenied, Valida
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 
+from artifactmgr.apps.artifacts.api.pagination import PageNumberOrCursorPagination
 from artifactmgr.apps.artifacts.api.validators import validate_artifact_version_create, \
     validate_artifact_version_update, validate_contents_download
 from artifactmgr.apps.artifacts.api.version_serializers import ArtifactContentsUploadSerializer, \
     ArtifactVersionSerializer, ArtifactVersionUpdateSerializer
-from artifactmgr.apps.artifacts.models import Artifact, ArtifactVersion, VersionDownloads
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactVersion
 from artifactmgr.utils.artifact_version_storage import create_fabric_artifact_contents, download_contents_by_urn
+from artifactmgr.utils.conditional_get import conditional_response, list_validators, principals_class, \
+    version_validators
 from artifactmgr.utils.fabric_auth import get_api_user
+from artifactmgr.utils.usage_events import record_version_download
 
 
 class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
@@ -44,14 +50,14 @@ class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     permission_classes = [permissions.AllowAny]
     lookup_field = 'uuid'
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-created', '-uuid')
 
     def get_queryset(self):
         api_user = get_api_user(request=self.request)
         return ArtifactVersion.objects.filter(
-            Q(artifact__visibility=Artifact.PUBLIC) |
-            Q(artifact__project_uuid__in=api_user.projects) |
-            Q(artifact__authors__uuid__contains=api_user.uuid)
-        ).distinct().order_by('-created')
+            artifact__in=Artifact.objects.visible_to(api_user)
+        ).order_by('-created', '-uuid')
 
     def get_serializer_class(self):
         return self.serializer_classes.get(self.action, self.default_serializer_class)
@@ -60,9 +66,13 @@ class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
         """
         FABRIC Artifact Contents - list view
         - Search by 'storage_repo', 'storage_type'
+        - Conditional GET: ETag of the versions visible to the user, 304 on If-None-Match match
         """
         try:
-            return super().list(request, *args, **kwargs)
+            api_user = get_api_user(request=request)
+            validators = list_validators(viewer_class=principals_class(api_user), request_path=request.get_full_path())
+            return conditional_response(request, api_user=api_user, validators=validators,
+                                        build=partial(super().list, request, *args, **kwargs))
         except Exception as e:
             print(e)
 
@@ -96,16 +106,22 @@ class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
     def retrieve(self, request, *args, **kwargs):
         """
         retrieve (GET {int:pk})
+        - Conditional GET: ETag / Last-Modified, 304 on If-None-Match match
         """
-        return super().retrieve(request, *args, **kwargs)
+        api_user = get_api_user(request=request)
+        validators = version_validators(self.get_queryset().filter(uuid=kwargs.get('uuid')), viewer_class='reader')
+        return conditional_response(request, api_user=api_user, validators=validators,
+                                    build=partial(super().retrieve, request, *args, **kwargs))
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         """
         update (PATCH {int:pk})
         - Must be an author of the Artifact to update Artifact contents
         """
         api_user = get_api_user(request=request)
-        version = get_object_or_404(ArtifactVersion, uuid=kwargs.get('uuid'))
+        # lock the version row so concurrent toggles move its downloads between rollups exactly once
+        version = get_object_or_404(ArtifactVersion.objects.select_for_update(), uuid=kwargs.get('uuid'))
         artifact = version.artifact
         if api_user.uuid in [a.uuid for a in artifact.authors.all()]:
             is_valid, message = validate_artifact_version_update(request)
@@ -113,11 +129,24 @@ class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
                 request_data = request.data
                 # active
                 active = request_data.get('active', None)
+                was_active = version.active
                 if str(active).casefold() == 'true':
                     version.active = True
                 if str(active).casefold() == 'false':
                     version.active = False
-                version.save()
+                # counters are only ever changed with F() updates, never saved from the (possibly stale) instance
+                version.save(update_fields=['active'])
+                # move this version's downloads between the artifact's active / retired rollups
+                if version.active != was_active:
+                    moved = Subquery(ArtifactVersion.objects.filter(uuid=version.uuid).values('download_count')[:1])
+                    if version.active:
+                        Artifact.objects.filter(uuid=version.artifact_id).update(
+                            downloads_active=F('downloads_active') + moved,
+                            downloads_retired=F('downloads_retired') - moved)
+                    else:
+                        Artifact.objects.filter(uuid=version.artifact_id).update(
+                            downloads_active=F('downloads_active') - moved,
+                            downloads_retired=F('downloads_retired') + moved)
                 # print(ArtifactVersionSerializer(instance=version).data)
                 # return updated artifact
                 return Response(data=ArtifactVersionSerializer(instance=version).data, status=204)
@@ -157,10 +186,7 @@ class ArtifactVersionViewSet(viewsets.ModelViewSet, viewsets.ViewSet):
             try:
                 version_uuid = version_urn.split(':')[-1]
                 artifact_version = get_object_or_404(ArtifactVersion, uuid=version_uuid)
-                version_download = VersionDownloads(downloaded_by=str(api_user.uuid))
-                version_download.save()
-                artifact_version.version_downloads.add(version_download)
-                artifact_version.save()
+                record_version_download(version=artifact_version, downloaded_by=str(api_user.uuid))
             except Exception as exc:
                 print(exc)
             return download_contents_by_urn(urn=kwargs.get('urn'))
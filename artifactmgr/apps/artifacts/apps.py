@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ArtifactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'artifactmgr.apps.artifacts'
+
+    def ready(self):
+        # keep ArtifactAccess, the search vector and ProjectSummary in sync with the artifact
+        from artifactmgr.apps.artifacts import signals  # noqa: F401
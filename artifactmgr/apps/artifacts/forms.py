@@ -1,7 +1,7 @@
 from django import forms
 from django.forms import CheckboxSelectMultiple
 
-from artifactmgr.apps.artifacts.models import ApiUser, Artifact, ArtifactAuthor, ArtifactTag
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactTag
 
 
 class ArtifactForm(forms.ModelForm):
@@ -75,9 +75,8 @@ class ArtifactForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         authors = kwargs.pop('authors', [])
-        api_user_uuid = kwargs.pop('api_user', None)
+        api_user = kwargs.pop('api_user', None)
         super().__init__(*args, **kwargs)
-        api_user = ApiUser.objects.filter(uuid=api_user_uuid).first()
 
         if api_user and api_user.is_artifact_manager_admin:
             available_tags = [(t.tag, t.tag)
@@ -0,0 +1,119 @@
+import json
+import os
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from artifactmgr.apps.apiuser.models import TaskTimeoutTracker
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactDailyUsage, ArtifactVersion, VersionDailyUsage
+from artifactmgr.utils.hyperloglog import HyperLogLog
+
+
+def count_subquery(queryset, group_by: str):
+    """
+    Correlated COUNT(*) subquery (0 when there are no rows)
+    """
+    return Coalesce(Subquery(
+        queryset.order_by().values(group_by).annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def sum_subquery(queryset, group_by: str, field: str):
+    """
+    Correlated SUM(field) subquery (0 when there are no rows)
+    """
+    return Coalesce(Subquery(
+        queryset.order_by().values(group_by).annotate(total=Sum(field)).values('total')
+    ), 0)
+
+
+def downloads_subquery(active: bool):
+    """
+    Correlated SUM(download_count) over an artifact's active or retired versions (0 when there are none)
+    """
+    return Coalesce(Subquery(
+        ArtifactVersion.objects.filter(artifact_id=OuterRef('pk'), active=active).order_by().values(
+            'artifact_id').annotate(total=Sum('download_count')).values('total')
+    ), 0)
+
+
+@transaction.atomic
+def backfill_usage_counters():
+    """
+    Recompute the denormalized usage counters from the daily rollup buckets and the raw events not yet rolled up
+    - ArtifactVersion.download_count
+    - Artifact.view_count, downloads_active, downloads_retired
+    - HyperLogLog sketches and unique_viewers / unique_downloaders on Artifact and ArtifactVersion
+    - events up to the usage_rollup watermark are read from ArtifactDailyUsage / VersionDailyUsage (their raw rows
+      may have been pruned by --retention-days), events above it from the ArtifactViews / VersionDownloads tables
+    - holds the usage_rollup tracker row lock, so a concurrent rollup cannot move the watermark or prune meanwhile
+    """
+    tracker = TaskTimeoutTracker.objects.select_for_update().filter(name=os.getenv('ROLLUP_NAME')).first()
+    watermark = json.loads(tracker.value) if tracker and tracker.value else {}
+    views_since = int(watermark.get('views', 0))
+    downloads_since = int(watermark.get('downloads', 0))
+    view_links = Artifact.artifact_views.through.objects.filter(artifactviews_id__gt=views_since)
+    download_links = ArtifactVersion.version_downloads.through.objects.filter(
+        versiondownloads_id__gt=downloads_since)
+    versions = ArtifactVersion.objects.update(
+        download_count=sum_subquery(
+            VersionDailyUsage.objects.filter(version_id=OuterRef('pk')), 'version_id', 'downloads'
+        ) + count_subquery(download_links.filter(artifactversion_id=OuterRef('pk')), 'artifactversion_id')
+    )
+    artifacts = Artifact.objects.update(
+        view_count=sum_subquery(
+            ArtifactDailyUsage.objects.filter(artifact_id=OuterRef('pk')), 'artifact_id', 'views'
+        ) + count_subquery(view_links.filter(artifact_id=OuterRef('pk')), 'artifact_id'),
+        downloads_active=downloads_subquery(active=True),
+        downloads_retired=downloads_subquery(active=False)
+    )
+    # unique viewer / downloader sketches: the daily bucket sketches merged with the distinct (artifact|version, user)
+    # pairs of the events not yet rolled up
+    viewers = defaultdict(HyperLogLog)
+    artifact_downloaders = defaultdict(HyperLogLog)
+    version_downloaders = defaultdict(HyperLogLog)
+    for artifact_uuid, viewers_sketch, downloaders_sketch in ArtifactDailyUsage.objects.values_list(
+            'artifact_id', 'viewers_sketch', 'downloaders_sketch').iterator():
+        viewers[artifact_uuid].merge(viewers_sketch)
+        artifact_downloaders[artifact_uuid].merge(downloaders_sketch)
+    for version_uuid, downloaders_sketch in VersionDailyUsage.objects.values_list(
+            'version_id', 'downloaders_sketch').iterator():
+        version_downloaders[version_uuid].merge(downloaders_sketch)
+    for artifact_uuid, viewed_by in view_links.values_list(
+            'artifact_id', 'artifactviews__viewed_by').distinct().iterator():
+        viewers[artifact_uuid].add(viewed_by)
+    downloads = download_links.values_list(
+        'artifactversion_id', 'artifactversion__artifact_id', 'versiondownloads__downloaded_by').distinct()
+    for version_uuid, artifact_uuid, downloaded_by in downloads.iterator():
+        artifact_downloaders[artifact_uuid].add(downloaded_by)
+        version_downloaders[version_uuid].add(downloaded_by)
+    Artifact.objects.update(viewers_sketch=None, unique_viewers=0, downloaders_sketch=None, unique_downloaders=0)
+    ArtifactVersion.objects.update(downloaders_sketch=None, unique_downloaders=0)
+    Artifact.objects.bulk_update([
+        Artifact(uuid=artifact_uuid,
+                 viewers_sketch=viewers[artifact_uuid].to_bytes(),
+                 unique_viewers=viewers[artifact_uuid].count(),
+                 downloaders_sketch=artifact_downloaders[artifact_uuid].to_bytes(),
+                 unique_downloaders=artifact_downloaders[artifact_uuid].count())
+        for artifact_uuid in set(viewers) | set(artifact_downloaders)
+    ], fields=['viewers_sketch', 'unique_viewers', 'downloaders_sketch', 'unique_downloaders'], batch_size=500)
+    ArtifactVersion.objects.bulk_update([
+        ArtifactVersion(uuid=version_uuid, downloaders_sketch=sketch.to_bytes(), unique_downloaders=sketch.count())
+        for version_uuid, sketch in version_downloaders.items()
+    ], fields=['downloaders_sketch', 'unique_downloaders'], batch_size=500)
+    print('backfilled usage counters: {0} artifacts, {1} versions (rollup watermark: views {2}, downloads {3})'.format(
+        artifacts, versions, views_since, downloads_since))
+
+
+class Command(BaseCommand):
+    help = 'Backfill artifact view / download counters from the daily usage rollup and the raw events'
+
+    def handle(self, *args, **kwargs):
+        try:
+            backfill_usage_counters()
+        except Exception as e:
+            print(e)
+            raise CommandError('Backfill failed.')
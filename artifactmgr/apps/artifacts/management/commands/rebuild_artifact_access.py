@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from artifactmgr.utils.artifact_access import rebuild_artifact_access
+
+
+class Command(BaseCommand):
+    help = 'Recompute the ArtifactAccess visibility table from artifact visibility, project and authors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='only report missing / stale rows, do not change anything')
+
+    def handle(self, *args, **kwargs):
+        try:
+            summary = rebuild_artifact_access(dry_run=kwargs.get('check'))
+            print('artifact access {0}: {1}'.format('check' if kwargs.get('check') else 'rebuilt', summary))
+        except Exception as e:
+            print(e)
+            raise CommandError('Rebuild artifact access failed.')
+        if kwargs.get('check') and (summary.get('missing') or summary.get('stale')):
+            raise CommandError('ArtifactAccess is out of sync, run manage.py rebuild_artifact_access')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from artifactmgr.utils.project_summary import rebuild_project_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized project catalog (ProjectSummary) from the artifacts'
+
+    def handle(self, *args, **kwargs):
+        try:
+            result = rebuild_project_summaries()
+            print('project summaries - projects: {0}, stale deleted: {1}'.format(
+                result.get('projects'), result.get('deleted')))
+        except Exception as e:
+            print(e)
+            raise CommandError('Rebuild project summaries failed.')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from artifactmgr.utils.artifact_search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Backfill the artifact full-text search vectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='recompute every artifact (e.g. after changing SEARCH_CONFIG), not only missing ones')
+
+    def handle(self, *args, **kwargs):
+        try:
+            updated = rebuild_search_vectors(rebuild_all=kwargs.get('all'))
+            print('search vectors updated: {0}'.format(updated))
+        except Exception as e:
+            print(e)
+            raise CommandError('Rebuild search vectors failed.')
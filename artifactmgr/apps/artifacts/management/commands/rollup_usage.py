@@ -0,0 +1,23 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from artifactmgr.utils.usage_rollup import rollup_usage
+
+
+class Command(BaseCommand):
+    help = 'Roll up new artifact view / version download events into the daily usage tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=int(os.getenv('USAGE_RETENTION_DAYS', 0)),
+                            help='delete rolled up raw events older than this many days (0 = keep forever)')
+        parser.add_argument('--lag', type=int, default=300,
+                            help='leave events younger than this many seconds for the next run')
+
+    def handle(self, *args, **kwargs):
+        try:
+            summary = rollup_usage(retention_days=kwargs.get('retention_days'), lag_seconds=kwargs.get('lag'))
+            print('rolled up usage: {0}'.format(summary))
+        except Exception as e:
+            print(e)
+            raise CommandError('Usage rollup failed.')
@@ -0,0 +1,105 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:36
+
+import artifactmgr.apps.artifacts.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtifactAuthor',
+            fields=[
+                ('affiliation', models.CharField(max_length=255)),
+                ('email', models.CharField(blank=True, max_length=255, null=True)),
+                ('name', models.CharField(max_length=255)),
+                ('updated', models.DateTimeField(auto_now_add=True)),
+                ('uuid', models.CharField(max_length=255, primary_key=True, serialize=False)),
+            ],
+            options={
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArtifactTag',
+            fields=[
+                ('tag', artifactmgr.apps.artifacts.models.LowerCaseField(max_length=255, primary_key=True, serialize=False)),
+                ('restricted', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ('tag',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArtifactViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viewed_at', models.DateTimeField(auto_now_add=True)),
+                ('viewed_by', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'ordering': ('viewed_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='VersionDownloads',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('downloaded_at', models.DateTimeField(auto_now_add=True)),
+                ('downloaded_by', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'ordering': ('downloaded_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Artifact',
+            fields=[
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('description_long', models.TextField(max_length=5000)),
+                ('description_short', models.CharField(blank=True, max_length=255, null=True)),
+                ('modified', models.DateTimeField()),
+                ('project_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('project_uuid', models.CharField(blank=True, max_length=255, null=True)),
+                ('show_authors', models.BooleanField(default=True)),
+                ('show_project', models.BooleanField(default=True)),
+                ('title', models.CharField(max_length=255)),
+                ('visibility', models.CharField(choices=[('author', 'Author'), ('project', 'Project'), ('public', 'Public')], default='author', max_length=24)),
+                ('uuid', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('authors', models.ManyToManyField(related_name='artifact_author', to='artifacts.artifactauthor')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='artifact_created_by', to='artifacts.artifactauthor')),
+                ('modified_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='artifact_modified_by', to='artifacts.artifactauthor')),
+                ('tags', models.ManyToManyField(blank=True, related_name='artifact_tags', to='artifacts.artifacttag')),
+                ('artifact_views', models.ManyToManyField(related_name='artifact_views', to='artifacts.artifactviews')),
+            ],
+            options={
+                'ordering': ('title',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArtifactVersion',
+            fields=[
+                ('active', models.BooleanField(default=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('storage_id', models.CharField(max_length=255)),
+                ('storage_repo', models.CharField(max_length=255)),
+                ('storage_type', models.CharField(choices=[('fabric', 'FABRIC'), ('git', 'Git'), ('zenodo', 'Zenodo')], default='fabric', max_length=24)),
+                ('uuid', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifact_version', to='artifacts.artifact')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='version_created_by', to='artifacts.artifactauthor')),
+                ('version_downloads', models.ManyToManyField(related_name='version_downloads', to='artifacts.versiondownloads')),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,149 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:38
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from artifactmgr.utils.hyperloglog import HyperLogLog
+
+
+def backfill_usage_counters(apps, schema_editor):
+    """
+    Count the views / downloads recorded before the counter columns existed (no daily rollup buckets yet)
+    - ArtifactVersion.download_count, Artifact.view_count, downloads_active, downloads_retired
+    - HyperLogLog sketches and unique_viewers / unique_downloaders from the distinct (artifact|version, user) pairs
+    """
+    Artifact = apps.get_model('artifacts', 'Artifact')
+    ArtifactVersion = apps.get_model('artifacts', 'ArtifactVersion')
+    view_links = Artifact.artifact_views.through.objects
+    download_links = ArtifactVersion.version_downloads.through.objects
+    views = Counter()
+    viewers = defaultdict(HyperLogLog)
+    for artifact_uuid, viewed_by in view_links.values_list('artifact_id', 'artifactviews__viewed_by').iterator():
+        views[artifact_uuid] += 1
+        viewers[artifact_uuid].add(viewed_by)
+    downloads = Counter()
+    artifact_downloaders = defaultdict(HyperLogLog)
+    version_downloaders = defaultdict(HyperLogLog)
+    for version_uuid, artifact_uuid, downloaded_by in download_links.values_list(
+            'artifactversion_id', 'artifactversion__artifact_id', 'versiondownloads__downloaded_by').iterator():
+        downloads[version_uuid] += 1
+        artifact_downloaders[artifact_uuid].add(downloaded_by)
+        version_downloaders[version_uuid].add(downloaded_by)
+    downloads_active = Counter()
+    downloads_retired = Counter()
+    versions = []
+    for version in ArtifactVersion.objects.filter(uuid__in=set(downloads)).only('uuid', 'artifact_id', 'active'):
+        version.download_count = downloads.get(version.uuid)
+        version.downloaders_sketch = version_downloaders[version.uuid].to_bytes()
+        version.unique_downloaders = version_downloaders[version.uuid].count()
+        versions.append(version)
+        rollup = downloads_active if version.active else downloads_retired
+        rollup[version.artifact_id] += version.download_count
+    ArtifactVersion.objects.bulk_update(
+        versions, fields=['download_count', 'downloaders_sketch', 'unique_downloaders'], batch_size=500)
+    artifacts = []
+    for artifact in Artifact.objects.filter(uuid__in=set(views) | set(artifact_downloaders)).only('uuid'):
+        artifact.view_count = views.get(artifact.uuid, 0)
+        artifact.downloads_active = downloads_active.get(artifact.uuid, 0)
+        artifact.downloads_retired = downloads_retired.get(artifact.uuid, 0)
+        artifact.viewers_sketch = viewers[artifact.uuid].to_bytes()
+        artifact.unique_viewers = viewers[artifact.uuid].count()
+        artifact.downloaders_sketch = artifact_downloaders[artifact.uuid].to_bytes()
+        artifact.unique_downloaders = artifact_downloaders[artifact.uuid].count()
+        artifacts.append(artifact)
+    Artifact.objects.bulk_update(
+        artifacts, fields=['view_count', 'downloads_active', 'downloads_retired', 'viewers_sketch', 'unique_viewers',
+                           'downloaders_sketch', 'unique_downloaders'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='downloaders_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='downloads_active',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='downloads_retired',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='unique_downloaders',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='unique_viewers',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='view_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='viewers_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='artifactversion',
+            name='download_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifactversion',
+            name='downloaders_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='artifactversion',
+            name='unique_downloaders',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ArtifactDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('downloaders_sketch', models.BinaryField(blank=True, null=True)),
+                ('downloads', models.IntegerField(default=0)),
+                ('viewers_sketch', models.BinaryField(blank=True, null=True)),
+                ('views', models.IntegerField(default=0)),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='artifacts.artifact')),
+            ],
+            options={
+                'ordering': ('day',),
+                'constraints': [models.UniqueConstraint(fields=('artifact', 'day'), name='unique_artifact_daily_usage')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VersionDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('downloaders_sketch', models.BinaryField(blank=True, null=True)),
+                ('downloads', models.IntegerField(default=0)),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='artifacts.artifactversion')),
+            ],
+            options={
+                'ordering': ('day',),
+                'constraints': [models.UniqueConstraint(fields=('version', 'day'), name='unique_version_daily_usage')],
+            },
+        ),
+        migrations.RunPython(backfill_usage_counters, migrations.RunPython.noop),
+    ]
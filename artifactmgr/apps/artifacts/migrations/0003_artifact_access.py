@@ -0,0 +1,48 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# ArtifactAccess.PUBLIC_PRINCIPAL
+PUBLIC_PRINCIPAL = 'public'
+
+
+def build_artifact_access(apps, schema_editor):
+    """
+    Materialize the principals of every existing artifact: public (public visibility), its project_uuid and the
+    uuid of each of its authors
+    """
+    Artifact = apps.get_model('artifacts', 'Artifact')
+    ArtifactAccess = apps.get_model('artifacts', 'ArtifactAccess')
+    principals = set()
+    for uuid, visibility, project_uuid in Artifact.objects.values_list('uuid', 'visibility', 'project_uuid').iterator():
+        if visibility == 'public':
+            principals.add((uuid, PUBLIC_PRINCIPAL))
+        if project_uuid:
+            principals.add((uuid, project_uuid))
+    principals.update(Artifact.authors.through.objects.values_list('artifact_id', 'artifactauthor_id'))
+    ArtifactAccess.objects.bulk_create(
+        [ArtifactAccess(artifact_id=artifact_uuid, principal=principal) for artifact_uuid, principal in principals],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0002_usage_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtifactAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('principal', models.CharField(max_length=255)),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='artifacts.artifact')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('principal', 'artifact'), name='unique_artifact_access')],
+            },
+        ),
+        migrations.RunPython(build_artifact_access, migrations.RunPython.noop),
+    ]
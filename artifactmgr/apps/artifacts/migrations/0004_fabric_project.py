@@ -0,0 +1,24 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0003_artifact_access'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FabricProject',
+            fields=[
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('uuid', models.CharField(max_length=255, primary_key=True, serialize=False)),
+            ],
+            options={
+                'ordering': ('name',),
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:40
+
+import os
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, StringAgg, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """
+    Build search_vector for the existing artifacts with one UPDATE (same document as artifactmgr.utils.artifact_search)
+    - A - title, B - description_short and tags, C - project_name, D - description_long
+    """
+    Artifact = apps.get_model('artifacts', 'Artifact')
+    config = os.getenv('SEARCH_CONFIG', 'english')
+    tags = Coalesce(Subquery(
+        Artifact.tags.through.objects.filter(
+            artifact_id=OuterRef('pk')
+        ).values('artifact_id').annotate(
+            tags=StringAgg('artifacttag_id', delimiter=Value(' '))
+        ).values('tags')[:1]
+    ), Value(''), output_field=TextField())
+    Artifact.objects.update(search_vector=(
+            SearchVector('title', weight='A', config=config) +
+            SearchVector('description_short', weight='B', config=config) +
+            SearchVector(tags, weight='B', config=config) +
+            SearchVector('project_name', weight='C', config=config) +
+            SearchVector('description_long', weight='D', config=config)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0004_fabric_project'),
+    ]
+
+    operations = [
+        # pg_trgm for the gin_trgm_ops indexes of 0006 (/api/suggest)
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='artifact',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the indexes without blocking writes to existing tables
+    atomic = False
+
+    dependencies = [
+        ('artifacts', '0005_search'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='artifact',
+            index=models.Index(fields=['-modified', '-uuid'], name='artifact_modified_uuid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifact',
+            index=models.Index(fields=['project_uuid'], name='artifact_project_uuid_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifact',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='artifact_search_vector_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifact',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='artifact_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='artifact',
+            index=models.Index(fields=['visibility', '-modified'], name='artifact_visibility_mod_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifactauthor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['affiliation'], name='author_affiliation_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='artifactauthor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='author_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='artifacttag',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag'], name='tag_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='artifactversion',
+            index=models.Index(fields=['artifact', 'active'], name='version_artifact_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifactversion',
+            index=models.Index(fields=['artifact', 'storage_id'], name='version_artifact_storage_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artifactversion',
+            index=models.Index(fields=['-created', '-uuid'], name='version_created_uuid_idx'),
+        ),
+    ]
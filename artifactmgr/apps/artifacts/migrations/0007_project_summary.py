@@ -0,0 +1,48 @@
+# Generated by Django 6.0.6 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+
+
+def build_project_summaries(apps, schema_editor):
+    """
+    One ProjectSummary row per project of the existing artifacts (same grouping as artifactmgr.utils.project_summary)
+    """
+    Artifact = apps.get_model('artifacts', 'Artifact')
+    ProjectSummary = apps.get_model('artifacts', 'ProjectSummary')
+    latest_name = Artifact.objects.filter(
+        project_uuid=OuterRef('project_uuid'), project_name__isnull=False
+    ).order_by('-modified').values('project_name')[:1]
+    rows = Artifact.objects.exclude(project_uuid__isnull=True).exclude(project_uuid='').values(
+        'project_uuid'
+    ).annotate(
+        last_modified=Max('modified'),
+        name=Subquery(latest_name),
+        public_count=Count('uuid', filter=Q(show_project=True, visibility='public')),
+        total_count=Count('uuid', filter=Q(show_project=True))
+    ).order_by()
+    ProjectSummary.objects.bulk_create([ProjectSummary(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0006_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSummary',
+            fields=[
+                ('last_modified', models.DateTimeField(blank=True, null=True)),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('project_uuid', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('public_count', models.IntegerField(default=0)),
+                ('total_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('name',),
+            },
+        ),
+        migrations.RunPython(build_project_summaries, migrations.RunPython.noop),
+    ]
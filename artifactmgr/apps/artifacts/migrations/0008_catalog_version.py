@@ -0,0 +1,29 @@
+# Generated by Django 6.0.6 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+def create_catalog_versions(apps, schema_editor):
+    """
+    Seed the counter rows so that the signals only ever increment them
+    """
+    CatalogVersion = apps.get_model('artifacts', 'CatalogVersion')
+    CatalogVersion.objects.get_or_create(name='artifacts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0007_project_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_catalog_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.6 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Q, Subquery
+
+
+def recompute_project_summaries(apps, schema_editor):
+    """
+    Recompute name, member_last_modified and public_last_modified from the artifacts that show their project
+    (same grouping as artifactmgr.utils.project_summary)
+    """
+    Artifact = apps.get_model('artifacts', 'Artifact')
+    ProjectSummary = apps.get_model('artifacts', 'ProjectSummary')
+    latest_name = Artifact.objects.filter(
+        project_uuid=OuterRef('project_uuid'), project_name__isnull=False, show_project=True
+    ).order_by('-modified').values('project_name')[:1]
+    rows = Artifact.objects.exclude(project_uuid__isnull=True).exclude(project_uuid='').values(
+        'project_uuid'
+    ).annotate(
+        member_last_modified=Max('modified', filter=Q(show_project=True)),
+        name=Subquery(latest_name),
+        public_last_modified=Max('modified', filter=Q(show_project=True, visibility='public'))
+    ).order_by()
+    ProjectSummary.objects.bulk_update(
+        [ProjectSummary(**row) for row in rows],
+        fields=['member_last_modified', 'name', 'public_last_modified'],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0008_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='projectsummary',
+            old_name='last_modified',
+            new_name='member_last_modified',
+        ),
+        migrations.AddField(
+            model_name='projectsummary',
+            name='public_last_modified',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(recompute_project_summaries, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch
 
 from artifactmgr.apps.apiuser.models import ApiUser
 
@@ -22,6 +25,10 @@ class ArtifactAuthor(models.Model):
 
     # Order by name
     class Meta:
+        indexes = [
+            GinIndex(fields=['affiliation'], name='author_affiliation_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['name'], name='author_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
         ordering = ("name",)
 
     def __str__(self):
@@ -31,6 +38,22 @@ class ArtifactAuthor(models.Model):
         return display
 
 
+class FabricProject(models.Model):
+    """
+    FabricProject
+    - Local copy of core-api project metadata by uuid (PROJECT_CACHE_PERSIST)
+    """
+    name = models.CharField(max_length=255, blank=True, null=True)
+    updated = models.DateTimeField(auto_now=True)
+    uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
+
+    class Meta:
+        ordering = ("name",)
+
+    def __str__(self):
+        return self.name or self.uuid
+
+
 class ArtifactTag(models.Model):
     """
     Represents artifact tags
@@ -41,6 +64,9 @@ class ArtifactTag(models.Model):
     restricted = models.BooleanField(default=False)
 
     class Meta:
+        indexes = [
+            GinIndex(fields=['tag'], name='tag_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
         ordering = ("tag",)
 
     def __str__(self):
@@ -60,6 +86,43 @@ class ArtifactViews(models.Model):
         ordering = ("viewed_at",)
 
 
+class ArtifactQuerySet(models.QuerySet):
+
+    def authored_by(self, author_uuid: str):
+        """
+        Artifacts with author_uuid among their authors, as an EXISTS on the authors M2M (no join fan-out / DISTINCT)
+        """
+        return self.filter(Exists(self.model.authors.through.objects.filter(
+            artifact_id=OuterRef('pk'), artifactauthor_id=author_uuid)))
+
+    def visible_to(self, api_user: ApiUser):
+        """
+        Artifacts the api_user can view, as one semi-join against the materialized ArtifactAccess table
+        - principals: public, the user's uuid (authored) and the user's projects
+        - the (principal, artifact) unique index of ArtifactAccess covers the lookup; no DISTINCT is needed
+        """
+        return self.filter(Exists(ArtifactAccess.objects.filter(
+            artifact_id=OuterRef('pk'),
+            principal__in=[ArtifactAccess.PUBLIC_PRINCIPAL, api_user.uuid, *api_user.projects])))
+
+    def with_serializer_data(self):
+        """
+        Join and prefetch everything ArtifactSerializer reads, so a page costs a constant number of queries
+        - created_by / modified_by - joined
+        - authors, tags, artifact_version - prefetched
+        - HyperLogLog sketches and the search vector are deferred (not serialized)
+        """
+        return self.defer(
+            'downloaders_sketch', 'search_vector', 'viewers_sketch'
+        ).select_related(
+            'created_by', 'modified_by'
+        ).prefetch_related(
+            'authors',
+            'tags',
+            Prefetch('artifact_version', queryset=ArtifactVersion.objects.defer('downloaders_sketch'))
+        )
+
+
 class Artifact(models.Model):
     """
     FABRIC Artifact
@@ -86,6 +149,9 @@ class Artifact(models.Model):
     deleted_at = models.DateTimeField(blank=True, null=True)
     description_long = models.TextField(max_length=5000, blank=False, null=False)
     description_short = models.CharField(max_length=255, blank=True, null=True)
+    downloaders_sketch = models.BinaryField(blank=True, null=True)
+    downloads_active = models.IntegerField(default=0)
+    downloads_retired = models.IntegerField(default=0)
     modified = models.DateTimeField()
     modified_by = models.ForeignKey(
         ArtifactAuthor,
@@ -95,16 +161,30 @@ class Artifact(models.Model):
     )
     project_name = models.CharField(max_length=255, blank=True, null=True)
     project_uuid = models.CharField(max_length=255, blank=True, null=True)
+    search_vector = SearchVectorField(blank=True, null=True)
     show_authors = models.BooleanField(default=True)
     show_project = models.BooleanField(default=True)
     tags = models.ManyToManyField(ArtifactTag, related_name="artifact_tags", blank=True)
     title = models.CharField(max_length=255, blank=False, null=False)
+    unique_downloaders = models.IntegerField(default=0)
+    unique_viewers = models.IntegerField(default=0)
+    view_count = models.IntegerField(default=0)
+    viewers_sketch = models.BinaryField(blank=True, null=True)
     visibility = models.CharField(
         max_length=24, choices=VISIBILITY_CHOICES, default=AUTHOR
     )
     uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
 
+    objects = ArtifactQuerySet.as_manager()
+
     class Meta:
+        indexes = [
+            models.Index(fields=['-modified', '-uuid'], name='artifact_modified_uuid_idx'),
+            models.Index(fields=['project_uuid'], name='artifact_project_uuid_idx'),
+            GinIndex(fields=['search_vector'], name='artifact_search_vector_idx'),
+            GinIndex(fields=['title'], name='artifact_title_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['visibility', '-modified'], name='artifact_visibility_mod_idx'),
+        ]
         ordering = ("title",)
 
     def __str__(self):
@@ -151,12 +231,15 @@ class ArtifactVersion(models.Model):
         null=True,
         on_delete=models.CASCADE,
     )
+    download_count = models.IntegerField(default=0)
+    downloaders_sketch = models.BinaryField(blank=True, null=True)
     filename = models.CharField(max_length=255, blank=False, null=False)
     storage_id = models.CharField(max_length=255, blank=False, null=False)
     storage_repo = models.CharField(max_length=255, blank=False, null=False)
     storage_type = models.CharField(
         max_length=24, choices=STORAGE_TYPE_CHOICES, default=FABRIC
     )
+    unique_downloaders = models.IntegerField(default=0)
     uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
     version_downloads = models.ManyToManyField(VersionDownloads, related_name="version_downloads")
 
@@ -168,4 +251,102 @@ class ArtifactVersion(models.Model):
         return 'urn:{0}:contents:{1}:{2}'.format(self.storage_type, self.storage_repo, self.uuid)
 
     class Meta:
+        indexes = [
+            models.Index(fields=['artifact', 'active'], name='version_artifact_active_idx'),
+            models.Index(fields=['artifact', 'storage_id'], name='version_artifact_storage_idx'),
+            models.Index(fields=['-created', '-uuid'], name='version_created_uuid_idx'),
+        ]
         ordering = ('-created',)
+
+
+class ArtifactAccess(models.Model):
+    """
+    ArtifactAccess
+    - materialized visibility: one row per principal that can view the artifact (artifactmgr.utils.artifact_access)
+    - principal - PUBLIC_PRINCIPAL (public artifacts), the artifact's project_uuid, or an author uuid
+    - a viewer can see an artifact when any of [PUBLIC_PRINCIPAL, api_user.uuid, *api_user.projects] has a row
+    """
+    PUBLIC_PRINCIPAL = "public"
+    artifact = models.ForeignKey(Artifact, on_delete=models.CASCADE, related_name="access")
+    principal = models.CharField(max_length=255, blank=False, null=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["principal", "artifact"], name="unique_artifact_access"),
+        ]
+
+
+class CatalogVersion(models.Model):
+    """
+    CatalogVersion
+    - per-table change counter, the list ETag stamp of the conditional GET endpoints (artifactmgr.utils.conditional_get)
+    - name - ARTIFACTS: artifacts, their versions, author / tag links and author profiles
+    - version - incremented inside the writing transaction (artifacts signals), never by usage counter updates
+    """
+    ARTIFACTS = "artifacts"
+    name = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
+    version = models.BigIntegerField(default=0)
+
+
+class ProjectSummary(models.Model):
+    """
+    ProjectSummary
+    - materialized project catalog: one row per project_uuid with artifacts (artifactmgr.utils.project_summary)
+    - name - project_name of the most recently modified artifact in the project that shows its project
+    - public_count - public artifacts that show their project
+    - total_count - artifacts that show their project (any visibility)
+    - member_last_modified - most recent modification of an artifact that shows its project (any visibility)
+    - public_last_modified - most recent modification of a public artifact that shows its project
+    """
+    member_last_modified = models.DateTimeField(blank=True, null=True)
+    name = models.CharField(max_length=255, blank=True, null=True)
+    project_uuid = models.CharField(primary_key=True, max_length=255, blank=False, null=False)
+    public_count = models.IntegerField(default=0)
+    public_last_modified = models.DateTimeField(blank=True, null=True)
+    total_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('name',)
+
+    def __str__(self):
+        return self.name or self.project_uuid
+
+
+class ArtifactDailyUsage(models.Model):
+    """
+    ArtifactDailyUsage
+    - per-artifact daily rollup of views and downloads (manage.py rollup_usage)
+    - day - date in UTC
+    - viewers_sketch / downloaders_sketch - HyperLogLog sketches of the day's distinct viewers / downloaders
+    """
+    artifact = models.ForeignKey(Artifact, on_delete=models.CASCADE, related_name="daily_usage")
+    day = models.DateField()
+    downloaders_sketch = models.BinaryField(blank=True, null=True)
+    downloads = models.IntegerField(default=0)
+    viewers_sketch = models.BinaryField(blank=True, null=True)
+    views = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("day",)
+        constraints = [
+            models.UniqueConstraint(fields=["artifact", "day"], name="unique_artifact_daily_usage"),
+        ]
+
+
+class VersionDailyUsage(models.Model):
+    """
+    VersionDailyUsage
+    - per-version daily rollup of downloads (manage.py rollup_usage)
+    - day - date in UTC
+    - downloaders_sketch - HyperLogLog sketch of the day's distinct downloaders
+    """
+    day = models.DateField()
+    downloaders_sketch = models.BinaryField(blank=True, null=True)
+    downloads = models.IntegerField(default=0)
+    version = models.ForeignKey(ArtifactVersion, on_delete=models.CASCADE, related_name="daily_usage")
+
+    class Meta:
+        ordering = ("day",)
+        constraints = [
+            models.UniqueConstraint(fields=["version", "day"], name="unique_version_daily_usage"),
+        ]
@@ -0,0 +1,172 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAuthor, ArtifactTag, ArtifactVersion
+from artifactmgr.utils.artifact_access import sync_artifact_access
+from artifactmgr.utils.artifact_search import SEARCH_FIELDS, update_search_vectors
+from artifactmgr.utils.conditional_get import bump_catalog_version
+from artifactmgr.utils.project_summary import SUMMARY_FIELDS, sync_project_summaries
+
+# Artifact fields that ArtifactAccess is derived from (besides the authors M2M)
+ACCESS_FIELDS = {'project_uuid', 'visibility'}
+
+
+def _linked_artifact_uuids(through, **filters) -> list:
+    """
+    uuids of the artifacts linked through an Artifact M2M table (authors / tags) to the given author / tag
+    """
+    return list(through.objects.filter(**filters).values_list('artifact_id', flat=True))
+
+
+@receiver(post_save, sender=Artifact, dispatch_uid='artifact_access_on_save')
+def artifact_access_on_save(sender, instance: Artifact, created: bool, raw: bool, update_fields=None, **kwargs):
+    """
+    Re-sync ArtifactAccess when an artifact is created or its visibility / project_uuid may have changed
+    - skipped for fixture loading (raw), run manage.py rebuild_artifact_access afterwards
+    """
+    if raw:
+        return
+    if created or update_fields is None or ACCESS_FIELDS.intersection(update_fields):
+        sync_artifact_access([instance.uuid])
+
+
+@receiver(m2m_changed, sender=Artifact.authors.through, dispatch_uid='artifact_access_on_authors_changed')
+def artifact_access_on_authors_changed(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    """
+    Re-sync ArtifactAccess when authors are added to / removed from an artifact (from either side of the M2M)
+    - author.artifact_author.clear() sends no pk_set: the author's artifacts are remembered on pre_clear
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_artifact_uuids = _linked_artifact_uuids(
+            Artifact.authors.through, artifactauthor_id=instance.pk)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        sync_artifact_access([instance.uuid])
+    elif pk_set:
+        sync_artifact_access(pk_set)
+    elif action == 'post_clear':
+        sync_artifact_access(getattr(instance, '_cleared_artifact_uuids', []))
+
+
+@receiver(pre_delete, sender=ArtifactAuthor, dispatch_uid='artifact_access_pre_author_delete')
+def artifact_access_pre_author_delete(sender, instance: ArtifactAuthor, **kwargs):
+    """
+    Remember the artifacts of an author being deleted: the cascade removes its M2M rows without m2m_changed
+    """
+    instance._linked_artifact_uuids = _linked_artifact_uuids(Artifact.authors.through, artifactauthor_id=instance.pk)
+
+
+@receiver(post_delete, sender=ArtifactAuthor, dispatch_uid='artifact_access_on_author_delete')
+def artifact_access_on_author_delete(sender, instance: ArtifactAuthor, **kwargs):
+    """
+    Re-sync ArtifactAccess of the artifacts a deleted author was linked to (drops the author's principal rows)
+    """
+    sync_artifact_access(getattr(instance, '_linked_artifact_uuids', []))
+
+
+@receiver(post_save, sender=Artifact, dispatch_uid='search_vector_on_save')
+def search_vector_on_save(sender, instance: Artifact, created: bool, raw: bool, update_fields=None, **kwargs):
+    """
+    Recompute the full-text search vector when an artifact is created or its searchable fields may have changed
+    - skipped for fixture loading (raw), run manage.py rebuild_search_vectors afterwards
+    """
+    if raw:
+        return
+    if created or update_fields is None or SEARCH_FIELDS.intersection(update_fields):
+        update_search_vectors([instance.uuid])
+
+
+@receiver(m2m_changed, sender=Artifact.tags.through, dispatch_uid='search_vector_on_tags_changed')
+def search_vector_on_tags_changed(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    """
+    Recompute the full-text search vector when tags are added to / removed from an artifact (from either side of the
+    M2M)
+    - tag.artifact_tags.clear() sends no pk_set: the tag's artifacts are remembered on pre_clear
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_artifact_uuids = _linked_artifact_uuids(Artifact.tags.through, artifacttag_id=instance.pk)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_search_vectors([instance.uuid])
+    elif pk_set:
+        update_search_vectors(pk_set)
+    elif action == 'post_clear':
+        update_search_vectors(getattr(instance, '_cleared_artifact_uuids', []))
+
+
+@receiver(pre_delete, sender=ArtifactTag, dispatch_uid='search_vector_pre_tag_delete')
+def search_vector_pre_tag_delete(sender, instance: ArtifactTag, **kwargs):
+    """
+    Remember the artifacts of a tag being deleted: the cascade removes its M2M rows without m2m_changed
+    """
+    instance._linked_artifact_uuids = _linked_artifact_uuids(Artifact.tags.through, artifacttag_id=instance.pk)
+
+
+@receiver(post_delete, sender=ArtifactTag, dispatch_uid='search_vector_on_tag_delete')
+def search_vector_on_tag_delete(sender, instance: ArtifactTag, **kwargs):
+    """
+    Recompute the full-text search vector of the artifacts a deleted tag was linked to
+    """
+    update_search_vectors(getattr(instance, '_linked_artifact_uuids', []))
+
+
+@receiver(pre_save, sender=Artifact, dispatch_uid='project_summary_pre_save')
+def project_summary_pre_save(sender, instance: Artifact, raw: bool, update_fields=None, **kwargs):
+    """
+    Remember the stored project_uuid of an existing artifact whose project may change, so that the summary of the
+    project it leaves is recomputed as well
+    """
+    if raw or instance._state.adding:
+        return
+    if update_fields is None or 'project_uuid' in update_fields:
+        instance._previous_project_uuid = Artifact.objects.filter(
+            pk=instance.pk).values_list('project_uuid', flat=True).first()
+
+
+@receiver(post_save, sender=Artifact, dispatch_uid='project_summary_on_save')
+def project_summary_on_save(sender, instance: Artifact, created: bool, raw: bool, update_fields=None, **kwargs):
+    """
+    Recompute ProjectSummary when an artifact is created or its project / visibility / modified may have changed
+    - skipped for fixture loading (raw), run manage.py rebuild_project_summaries afterwards
+    """
+    if raw:
+        return
+    if created or update_fields is None or SUMMARY_FIELDS.intersection(update_fields):
+        sync_project_summaries([instance.project_uuid, getattr(instance, '_previous_project_uuid', None)])
+
+
+@receiver(post_delete, sender=Artifact, dispatch_uid='project_summary_on_delete')
+def project_summary_on_delete(sender, instance: Artifact, **kwargs):
+    """
+    Recompute ProjectSummary of the project a deleted artifact belonged to
+    """
+    sync_project_summaries([instance.project_uuid])
+
+
+@receiver(post_save, sender=Artifact, dispatch_uid='catalog_version_on_artifact_save')
+@receiver(post_delete, sender=Artifact, dispatch_uid='catalog_version_on_artifact_delete')
+@receiver(post_save, sender=ArtifactVersion, dispatch_uid='catalog_version_on_version_save')
+@receiver(post_delete, sender=ArtifactVersion, dispatch_uid='catalog_version_on_version_delete')
+@receiver(post_save, sender=ArtifactAuthor, dispatch_uid='catalog_version_on_author_save')
+@receiver(post_delete, sender=ArtifactAuthor, dispatch_uid='catalog_version_on_author_delete')
+@receiver(post_delete, sender=ArtifactTag, dispatch_uid='catalog_version_on_tag_delete')
+def catalog_version_on_change(sender, **kwargs):
+    """
+    Invalidate the artifact / version list ETags when anything they serialize changes (usage counters excepted,
+    they are only ever changed by queryset updates)
+    """
+    bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Artifact.authors.through, dispatch_uid='catalog_version_on_authors_changed')
+@receiver(m2m_changed, sender=Artifact.tags.through, dispatch_uid='catalog_version_on_tags_changed')
+def catalog_version_on_links_changed(sender, action: str, **kwargs):
+    """
+    Invalidate the artifact / version list ETags when authors or tags are linked / unlinked (either side)
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
@@ -1 +1,658 @@
-# Create your tests here.
+import hashlib
+import json
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from artifactmgr.apps.apiuser.management.commands.init_anon_api_user import init_anon_api_user
+from artifactmgr.apps.apiuser.management.commands.init_task_timeout_tracker import init_task_timeout_tracker
+from artifactmgr.apps.apiuser.models import ApiUser, TaskTimeoutTracker
+from artifactmgr.apps.artifacts.api.suggest_viewsets import get_suggestions
+from artifactmgr.apps.artifacts.management.commands.backfill_usage_counters import backfill_usage_counters
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAccess, ArtifactAuthor, ArtifactTag, ArtifactVersion, \
+    ArtifactViews, VersionDownloads
+from artifactmgr.utils import fabric_auth
+from artifactmgr.utils.artifact_access import rebuild_artifact_access
+from artifactmgr.utils.project_summary import projects_visible_to
+from artifactmgr.utils.usage_events import flush_usage_events, record_artifact_view, record_version_download
+from artifactmgr.utils.usage_rollup import rollup_usage
+
+
+def create_artifact(uuid: str, visibility: str = Artifact.PUBLIC, project_uuid: str = None, authors=(), tags=(),
+                    versions: int = 0, modified: datetime = None) -> Artifact:
+    modified = modified or datetime.now(timezone.utc)
+    artifact = Artifact.objects.create(
+        description_long='description of {0}'.format(uuid),
+        modified=modified,
+        project_name='project {0}'.format(project_uuid) if project_uuid else None,
+        project_uuid=project_uuid,
+        title='artifact {0}'.format(uuid),
+        uuid=uuid,
+        visibility=visibility
+    )
+    if authors:
+        artifact.authors.add(*authors)
+    if tags:
+        artifact.tags.add(*tags)
+    for i in range(versions):
+        ArtifactVersion.objects.create(artifact=artifact, filename='file{0}.tgz'.format(i), storage_id=str(i),
+                                       storage_repo='renci', uuid='{0}-v{1}'.format(uuid, i))
+    return artifact
+
+
+class ArtifactListQueryCountTest(TestCase):
+    """
+    GET /api/artifacts (list, detail, by-author, by-project) and /api/contents issue a constant number of queries,
+    however many artifacts, authors, tags and versions are returned
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        init_anon_api_user()
+        cls.authors = [ArtifactAuthor.objects.create(affiliation='FABRIC', name='author {0}'.format(i),
+                                                     uuid='author-{0}'.format(i)) for i in range(3)]
+        cls.tags = [ArtifactTag.objects.create(tag='tag{0}'.format(i)) for i in range(3)]
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='127.0.0.1')
+        # detail views are buffered without the flusher thread, and drained before the test transaction ends
+        for patcher in [mock.patch('artifactmgr.utils.usage_events._ensure_flusher'),
+                        mock.patch.dict('os.environ', {'USAGE_BUFFER_ENABLED': 'true'})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(flush_usage_events)
+
+    def create_artifacts(self, count: int, offset: int = 0, project_uuid: str = None):
+        for i in range(offset, offset + count):
+            create_artifact('artifact-{0:03d}'.format(i), project_uuid=project_uuid, authors=self.authors,
+                            tags=self.tags, versions=2)
+
+    def count_queries(self, path: str = '/api/artifacts') -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_list_queries(self, path: str, create, listed_per_artifact: int = 1) -> dict:
+        """
+        create(count, offset) adds the artifacts listed at path: 2 for the baseline, then 8 more
+        """
+        create(2, 0)
+        baseline = self.count_queries(path)
+        create(8, 2)
+        with self.assertNumQueries(baseline):
+            response = self.client.get(path)
+        self.assertEqual(response.json().get('count'), 10 * listed_per_artifact)
+        return response.json()
+
+    def test_list_query_count_is_constant(self):
+        results = self.assert_constant_list_queries('/api/artifacts', self.create_artifacts).get('results')
+        self.assertEqual(len(results[0].get('authors')), 3)
+        self.assertEqual(len(results[0].get('tags')), 3)
+        self.assertEqual(len(results[0].get('versions')), 2)
+
+    def test_by_author_query_count_is_constant(self):
+        self.assert_constant_list_queries('/api/artifacts/by-author/author-0', self.create_artifacts)
+
+    def test_by_project_query_count_is_constant(self):
+        self.assert_constant_list_queries(
+            '/api/artifacts/by-project/project-1',
+            lambda count, offset: self.create_artifacts(count, offset=offset, project_uuid='project-1'))
+
+    def test_contents_query_count_is_constant(self):
+        self.assert_constant_list_queries('/api/contents', self.create_artifacts, listed_per_artifact=2)
+
+    def test_detail_query_count_is_constant(self):
+        create_artifact('artifact-small', authors=self.authors[:1], tags=self.tags[:1], versions=1)
+        baseline = self.count_queries('/api/artifacts/artifact-small')
+        create_artifact('artifact-large', authors=self.authors, tags=self.tags, versions=6)
+        with self.assertNumQueries(baseline):
+            response = self.client.get('/api/artifacts/artifact-large')
+        self.assertEqual(len(response.json().get('authors')), 3)
+        self.assertEqual(len(response.json().get('tags')), 3)
+        self.assertEqual(len(response.json().get('versions')), 6)
+
+
+class VisibilityTest(TestCase):
+    """
+    Artifact.objects.visible_to / authored_by return the same artifacts as the joined DISTINCT filters they replace,
+    without duplicates
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        alice, bob, carol = [ArtifactAuthor.objects.create(affiliation='FABRIC', name=name, uuid='{0}-uuid'.format(name))
+                             for name in ['alice', 'bob', 'carol']]
+        create_artifact('public-shared', authors=[alice, bob, carol])
+        create_artifact('public-project', project_uuid='project-1', authors=[bob, carol])
+        create_artifact('project-1', visibility=Artifact.PROJECT, project_uuid='project-1', authors=[alice, bob])
+        create_artifact('project-2', visibility=Artifact.PROJECT, project_uuid='project-2', authors=[carol])
+        create_artifact('author-alice', visibility=Artifact.AUTHOR, authors=[alice, carol])
+        create_artifact('author-alice-project-2', visibility=Artifact.AUTHOR, project_uuid='project-2',
+                        authors=[alice, bob])
+        create_artifact('author-carol', visibility=Artifact.AUTHOR, authors=[carol])
+        cls.users = {
+            'anonymous': ApiUser(uuid='anonymous-uuid', projects=[]),
+            'project member': ApiUser(uuid='dave-uuid', projects=['project-1']),
+            'author': ApiUser(uuid='alice-uuid', projects=[]),
+            'author and project member': ApiUser(uuid='carol-uuid', projects=['project-1', 'project-2'])
+        }
+
+    @staticmethod
+    def joined_visible_to(api_user: ApiUser):
+        return Artifact.objects.filter(
+            Q(visibility=Artifact.PUBLIC) |
+            Q(project_uuid__in=api_user.projects) |
+            Q(authors__uuid__in=[api_user.uuid])
+        )
+
+    @staticmethod
+    def uuids(artifacts) -> list:
+        return sorted(artifacts.values_list('uuid', flat=True))
+
+    def test_visible_to_matches_joined_distinct(self):
+        for name, api_user in self.users.items():
+            with self.subTest(name):
+                visible = self.uuids(Artifact.objects.visible_to(api_user))
+                self.assertEqual(visible, self.uuids(self.joined_visible_to(api_user).distinct()))
+                self.assertEqual(len(visible), len(set(visible)))
+        # the old join fans out over the authors M2M, hence its DISTINCT
+        joined = self.uuids(self.joined_visible_to(self.users.get('author and project member')))
+        self.assertGreater(len(joined), len(set(joined)))
+
+    def test_visible_to_by_case(self):
+        self.assertEqual(self.uuids(Artifact.objects.visible_to(self.users.get('anonymous'))),
+                         ['public-project', 'public-shared'])
+        self.assertEqual(self.uuids(Artifact.objects.visible_to(self.users.get('project member'))),
+                         ['project-1', 'public-project', 'public-shared'])
+        self.assertEqual(self.uuids(Artifact.objects.visible_to(self.users.get('author'))),
+                         ['author-alice', 'author-alice-project-2', 'project-1', 'public-project', 'public-shared'])
+
+    def test_authored_by_matches_joined_distinct(self):
+        for author_uuid in ['alice-uuid', 'bob-uuid', 'carol-uuid', 'nobody-uuid']:
+            for name, api_user in self.users.items():
+                with self.subTest(author=author_uuid, user=name):
+                    authored = self.uuids(Artifact.objects.authored_by(author_uuid).visible_to(api_user))
+                    joined = Artifact.objects.filter(authors__uuid__in=[author_uuid]).filter(
+                        Q(visibility=Artifact.PUBLIC) |
+                        Q(project_uuid__in=api_user.projects) |
+                        Q(authors__uuid__in=[api_user.uuid])
+                    ).distinct()
+                    self.assertEqual(authored, self.uuids(joined))
+                    self.assertEqual(len(authored), len(set(authored)))
+
+
+class VisibilityPlanTest(TestCase):
+    """
+    On a large catalog the first page of Artifact.objects.visible_to walks the list ordering index and probes
+    ArtifactAccess by index, without a sequential scan or the DISTINCT (Unique / sort) of the joined filters
+    """
+    ARTIFACTS = 100000
+    AUTHORS = 20000
+
+    @classmethod
+    def setUpTestData(cls):
+        artifact = connection.ops.quote_name(Artifact._meta.db_table)
+        author = connection.ops.quote_name(ArtifactAuthor._meta.db_table)
+        links = connection.ops.quote_name(Artifact.authors.through._meta.db_table)
+        access = connection.ops.quote_name(ArtifactAccess._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO {0} (uuid, name, affiliation, updated) "
+                "SELECT 'author-' || i, 'author ' || i, 'FABRIC', now() FROM generate_series(1, %s) i".format(author),
+                [cls.AUTHORS])
+            # 70% public, 20% project, 10% author, 2000 projects
+            cursor.execute(
+                "INSERT INTO {0} (uuid, title, description_long, modified, created, deleted, show_authors, "
+                "show_project, visibility, project_uuid, downloads_active, downloads_retired, unique_downloaders, "
+                "unique_viewers, view_count) "
+                "SELECT 'artifact-' || i, 'artifact ' || i, 'description', now() - i * interval '1 minute', now(), "
+                "false, true, true, CASE WHEN i %% 10 < 7 THEN %s WHEN i %% 10 < 9 THEN %s ELSE %s END, "
+                "'project-' || (i %% 2000), 0, 0, 0, 0, 0 FROM generate_series(1, %s) i".format(artifact),
+                [Artifact.PUBLIC, Artifact.PROJECT, Artifact.AUTHOR, cls.ARTIFACTS])
+            cursor.execute(
+                "INSERT INTO {0} (artifact_id, artifactauthor_id) "
+                "SELECT 'artifact-' || i, 'author-' || (((i * 7 + k * 13) %% %s) + 1) "
+                "FROM generate_series(1, %s) i, generate_series(0, 2) k".format(links),
+                [cls.AUTHORS, cls.ARTIFACTS])
+            cursor.execute(
+                "INSERT INTO {0} (artifact_id, principal) "
+                "SELECT uuid, %s FROM {1} WHERE visibility = %s "
+                "UNION SELECT uuid, project_uuid FROM {1} "
+                "UNION SELECT artifact_id, artifactauthor_id FROM {2}".format(access, artifact, links),
+                [ArtifactAccess.PUBLIC_PRINCIPAL, Artifact.PUBLIC])
+            cursor.execute('ANALYZE {0}, {1}, {2}, {3}'.format(artifact, author, links, access))
+
+    def test_first_page_plan(self):
+        users = {
+            'anonymous': ApiUser(uuid='anonymous-uuid', projects=[]),
+            'author and project member': ApiUser(uuid='author-5', projects=['project-1', 'project-2', 'project-3'])
+        }
+        for name, api_user in users.items():
+            with self.subTest(name):
+                plan = Artifact.objects.visible_to(api_user).order_by('-modified', '-uuid').values('uuid')[:20].explain()
+                self.assertIn('Index Only Scan using artifact_modified_uuid_idx', plan)
+                self.assertRegex(plan, r'Index (Only )?Scan using \S+ on {0}'.format(ArtifactAccess._meta.db_table))
+                for node in ['Seq Scan', 'Unique', 'Sort', 'HashAggregate']:
+                    self.assertNotIn(node, plan)
+
+
+
+class ArtifactAccessSignalTest(TestCase):
+    """
+    ArtifactAccess follows author changes made from the author side: deleting an author (its M2M rows are removed by
+    the cascade, without m2m_changed) and author.artifact_author.clear()
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob = [
+            ArtifactAuthor.objects.create(affiliation='FABRIC', name=name, uuid='{0}-uuid'.format(name))
+            for name in ['alice', 'bob']
+        ]
+        create_artifact('shared', visibility=Artifact.AUTHOR, authors=[cls.alice, cls.bob])
+        create_artifact('alice-only', visibility=Artifact.PROJECT, project_uuid='project-1', authors=[cls.alice])
+
+    @staticmethod
+    def visible_uuids(user_uuid: str, projects=()) -> list:
+        return sorted(Artifact.objects.visible_to(ApiUser(uuid=user_uuid, projects=list(projects))).values_list(
+            'uuid', flat=True))
+
+    def assert_in_sync(self):
+        self.assertEqual(rebuild_artifact_access(dry_run=True), {'artifacts': 2, 'missing': 0, 'stale': 0})
+
+    def test_author_delete(self):
+        self.assertEqual(self.visible_uuids('alice-uuid'), ['alice-only', 'shared'])
+        self.alice.delete()
+        self.assertEqual(self.visible_uuids('alice-uuid'), [])
+        self.assertEqual(self.visible_uuids('bob-uuid'), ['shared'])
+        self.assert_in_sync()
+
+    def test_reverse_clear(self):
+        self.alice.artifact_author.clear()
+        self.assertEqual(self.visible_uuids('alice-uuid'), [])
+        self.assertEqual(self.visible_uuids('bob-uuid'), ['shared'])
+        # the project principal of alice-only is unaffected
+        self.assertEqual(self.visible_uuids('carol-uuid', projects=['project-1']), ['alice-only'])
+        self.assert_in_sync()
+
+
+class SearchVectorSignalTest(TestCase):
+    """
+    search_vector follows tag changes made from the tag side: tag.artifact_tags.clear() and deleting a tag (its M2M
+    rows are removed by the cascade, without m2m_changed)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quantum, cls.network = [ArtifactTag.objects.create(tag=tag) for tag in ['quantum', 'network']]
+        for uuid in ['artifact-1', 'artifact-2']:
+            create_artifact(uuid, tags=[cls.quantum, cls.network])
+
+    @staticmethod
+    def matching_uuids(term: str) -> list:
+        return sorted(Artifact.objects.filter(search_vector=SearchQuery(term, config='english')).values_list(
+            'uuid', flat=True))
+
+    def test_reverse_clear(self):
+        self.assertEqual(self.matching_uuids('quantum'), ['artifact-1', 'artifact-2'])
+        self.quantum.artifact_tags.clear()
+        self.assertEqual(self.matching_uuids('quantum'), [])
+        self.assertEqual(self.matching_uuids('network'), ['artifact-1', 'artifact-2'])
+
+    def test_tag_delete(self):
+        self.quantum.delete()
+        self.assertEqual(self.matching_uuids('quantum'), [])
+        self.assertEqual(self.matching_uuids('network'), ['artifact-1', 'artifact-2'])
+
+
+class HotLookupPlanTest(TestCase):
+    """
+    The hot lookups are served by their indexes: list ordering, project_uuid, ApiUser.cilogon_id and
+    TaskTimeoutTracker.name
+    - sequential scans are disabled for the test transaction, so the planner picks an index whenever one can serve
+      the query (on the small test tables a sequential scan would otherwise always win)
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assert_index_scan(self, queryset, index: str = None) -> None:
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan)
+        # Index Scan / Index Only Scan using <index>, or Bitmap Index Scan on <index>
+        self.assertRegex(plan, r'Index (Only )?Scan (using|on) {0}'.format(index or r'\S+'))
+
+    def test_list_ordering(self):
+        queryset = Artifact.objects.order_by('-modified', '-uuid').values('uuid')[:20]
+        self.assert_index_scan(queryset, index='artifact_modified_uuid_idx')
+        self.assertNotIn('Sort', queryset.explain())
+
+    def test_project_uuid(self):
+        self.assert_index_scan(Artifact.objects.filter(project_uuid='project-1'), index='artifact_project_uuid_idx')
+
+    def test_cilogon_id(self):
+        self.assert_index_scan(ApiUser.objects.filter(cilogon_id='http://cilogon.org/serverA/users/1'))
+
+    def test_tracker_name(self):
+        self.assert_index_scan(TaskTimeoutTracker.objects.filter(name='token_revocation_list'))
+
+
+class SuggestTest(TestCase):
+    """
+    /api/suggest ranks each type by word similarity, returns at most limit matches per type and only suggests
+    artifacts visible to the user
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        init_anon_api_user()
+        alice = ArtifactAuthor.objects.create(affiliation='RENCI', name='alice', uuid='alice-uuid')
+        ArtifactAuthor.objects.create(affiliation='GPU lab', name='bob', uuid='bob-uuid')
+        ArtifactAuthor.objects.create(affiliation='FABRIC', name='carol', uuid='carol-uuid')
+        for uuid, title in [('exact', 'gpu'), ('prefix', 'gpus on fabric'), ('word', 'fabric gpu nodes'),
+                            ('other', 'storage')]:
+            Artifact.objects.filter(uuid=create_artifact(uuid).uuid).update(title=title)
+        create_artifact('private', visibility=Artifact.AUTHOR, authors=[alice])
+        Artifact.objects.filter(uuid='private').update(title='gpu private')
+        for tag in ['gpu', 'gpus', 'storage']:
+            ArtifactTag.objects.create(tag=tag)
+
+    def suggest(self, params: dict) -> dict:
+        response = APIClient(SERVER_NAME='127.0.0.1').get('/api/suggest', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranking_per_type(self):
+        suggestions = self.suggest({'q': 'gpu'})
+        # whole-word matches first (ties by title), then the partial word
+        self.assertEqual([artifact.get('uuid') for artifact in suggestions.get('artifacts')],
+                         ['word', 'exact', 'prefix'])
+        self.assertEqual(suggestions.get('authors'), [{'uuid': 'bob-uuid', 'name': 'bob', 'affiliation': 'GPU lab'}])
+        self.assertEqual(suggestions.get('tags'), [{'tag': 'gpu'}, {'tag': 'gpus'}])
+
+    def test_limit_per_type(self):
+        suggestions = self.suggest({'q': 'gpu', 'limit': 1})
+        self.assertEqual(suggestions.get('artifacts'), [{'uuid': 'word', 'title': 'fabric gpu nodes'}])
+        self.assertEqual(len(suggestions.get('authors')), 1)
+        self.assertEqual(suggestions.get('tags'), [{'tag': 'gpu'}])
+
+    def test_private_artifact_only_suggested_to_authors(self):
+        self.assertNotIn('private', [artifact.get('uuid') for artifact in self.suggest({'q': 'gpu'}).get('artifacts')])
+        suggestions = get_suggestions(api_user=ApiUser(uuid='alice-uuid', projects=[]), q='gpu', limit=5)
+        self.assertIn({'uuid': 'private', 'title': 'gpu private'}, suggestions.get('artifacts'))
+
+    def test_short_query(self):
+        response = APIClient(SERVER_NAME='127.0.0.1').get('/api/suggest', {'q': 'g'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Lists are validated by the CatalogVersion ETag only, single artifacts also by Last-Modified; usage counters
+    never invalidate either
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        init_anon_api_user()
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='127.0.0.1')
+        # buffer views without the flusher thread, flushed explicitly by the tests
+        for patcher in [mock.patch('artifactmgr.utils.usage_events._ensure_flusher'),
+                        mock.patch.dict('os.environ', {'USAGE_BUFFER_ENABLED': 'true'})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        flush_usage_events()
+        self.author = ArtifactAuthor.objects.create(affiliation='FABRIC', name='author', uuid='author-uuid')
+        modified = datetime.now(timezone.utc) - timedelta(days=1)
+        for i in range(2):
+            create_artifact('artifact-{0}'.format(i), project_uuid='project-1', authors=[self.author],
+                            modified=modified)
+
+    def test_list_has_no_last_modified(self):
+        response = self.client.get('/api/artifacts')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get('/api/artifacts', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_after_delete_is_not_modified_since(self):
+        etag = self.client.get('/api/artifacts')['ETag']
+        Artifact.objects.get(uuid='artifact-1').delete()
+        response = self.client.get('/api/artifacts', HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json().get('count'), 1)
+        response = self.client.get('/api/artifacts', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_has_last_modified(self):
+        response = self.client.get('/api/artifacts/artifact-0')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/artifacts/artifact-0', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_retrieve_if_none_match_across_flush(self):
+        etag = self.client.get('/api/artifacts/artifact-0')['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        # the polling client's own (recorded) views do not invalidate its copy
+        for _ in range(2):
+            response = self.client.get('/api/artifacts/artifact-0', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertGreater(flush_usage_events(), 0)
+        self.assertEqual(Artifact.objects.get(uuid='artifact-0').view_count, 3)
+        Artifact.objects.get(uuid='artifact-0').tags.add(ArtifactTag.objects.create(tag='new'))
+        self.assertEqual(self.client.get('/api/artifacts/artifact-0', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_ignores_views(self):
+        etag = self.client.get('/api/artifacts')['ETag']
+        self.client.get('/api/artifacts/artifact-1')
+        self.assertEqual(flush_usage_events(), 1)
+        self.assertEqual(self.client.get('/api/artifacts', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_list_etag_changes_on_artifact_change(self):
+        for change in [lambda artifact: artifact.save(),
+                       lambda artifact: artifact.authors.remove(self.author),
+                       lambda artifact: ArtifactVersion.objects.create(
+                           artifact=artifact, filename='f.tgz', storage_id='1', storage_repo='renci', uuid='v-1')]:
+            etag = self.client.get('/api/artifacts')['ETag']
+            change(Artifact.objects.get(uuid='artifact-1'))
+            self.assertEqual(self.client.get('/api/artifacts', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_by_author_and_by_project(self):
+        for path in ['/api/artifacts/by-author/author-uuid', '/api/artifacts/by-project/project-1']:
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual((response.status_code, response.json().get('count')), (200, 2))
+                self.assertNotEqual(response['ETag'], self.client.get('/api/artifacts')['ETag'])
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+                Artifact.objects.get(uuid='artifact-0').save()
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class UsageEventsTest(TestCase):
+    """
+    Usage counters
+    - buffered download events are split into the active / retired rollups at flush time
+    - backfill_usage_counters reproduces the live counters after raw events have been rolled up and pruned
+    """
+
+    def setUp(self):
+        patcher = mock.patch('artifactmgr.utils.usage_events._ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        flush_usage_events()
+
+    def test_version_retired_before_flush(self):
+        artifact = create_artifact('artifact-usage', versions=1)
+        version = artifact.artifact_version.get()
+        with mock.patch.dict('os.environ', {'USAGE_BUFFER_ENABLED': 'true'}):
+            record_version_download(version=version, downloaded_by='user-1')
+        # retire the version while its download is still buffered (it has no flushed downloads to move yet)
+        ArtifactVersion.objects.filter(uuid=version.uuid).update(active=False)
+        self.assertEqual(flush_usage_events(), 1)
+        artifact.refresh_from_db()
+        version.refresh_from_db()
+        self.assertEqual(version.download_count, 1)
+        self.assertEqual((artifact.downloads_active, artifact.downloads_retired), (0, 1))
+
+    @mock.patch.dict('os.environ', {'USAGE_BUFFER_ENABLED': 'false'})
+    def test_backfill_after_prune(self):
+        init_task_timeout_tracker()
+        artifact = create_artifact('artifact-backfill', versions=2)
+        active, retired = artifact.artifact_version.order_by('uuid')
+        for user in ['user-1', 'user-2', 'user-1']:
+            record_artifact_view(artifact_uuid=artifact.uuid, viewed_by=user)
+            record_version_download(version=active, downloaded_by=user)
+        record_version_download(version=retired, downloaded_by='user-3')
+        # retire a version and move its download, as the version update endpoint does
+        ArtifactVersion.objects.filter(uuid=retired.uuid).update(active=False)
+        Artifact.objects.filter(uuid=artifact.uuid).update(downloads_active=3, downloads_retired=1)
+        # roll up and prune everything recorded so far, then record one event above the watermark
+        past = datetime.now(timezone.utc) - timedelta(days=3)
+        ArtifactViews.objects.update(viewed_at=past)
+        VersionDownloads.objects.update(downloaded_at=past)
+        rollup_usage(retention_days=1, lag_seconds=0)
+        self.assertFalse(ArtifactViews.objects.exists() or VersionDownloads.objects.exists())
+        record_artifact_view(artifact_uuid=artifact.uuid, viewed_by='user-4')
+        fields = ['view_count', 'downloads_active', 'downloads_retired', 'unique_viewers', 'unique_downloaders']
+        live = Artifact.objects.values(*fields).get(uuid=artifact.uuid)
+        live_versions = list(ArtifactVersion.objects.values_list(
+            'uuid', 'download_count', 'unique_downloaders').order_by('uuid'))
+        Artifact.objects.update(view_count=0, downloads_active=0, downloads_retired=0)
+        backfill_usage_counters()
+        self.assertEqual(Artifact.objects.values(*fields).get(uuid=artifact.uuid), live)
+        self.assertEqual(live, {'view_count': 4, 'downloads_active': 3, 'downloads_retired': 1, 'unique_viewers': 3,
+                                'unique_downloaders': 3})
+        self.assertEqual(list(ArtifactVersion.objects.values_list(
+            'uuid', 'download_count', 'unique_downloaders').order_by('uuid')), live_versions)
+
+
+class ProjectSummaryTest(TestCase):
+    """
+    projects_visible_to reports, per viewer, only the counts and modification time of the artifacts listed for them
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = datetime.now(timezone.utc)
+        alice = ArtifactAuthor.objects.create(affiliation='FABRIC', name='alice', uuid='alice-uuid')
+        cls.public_modified = now - timedelta(days=3)
+        cls.private_modified = now - timedelta(days=2)
+        cls.hidden_modified = now - timedelta(days=1)
+        create_artifact('public', project_uuid='project-1', modified=cls.public_modified)
+        create_artifact('private', visibility=Artifact.PROJECT, project_uuid='project-1',
+                        modified=cls.private_modified)
+        hidden = create_artifact('hidden', project_uuid='project-1', authors=[alice], modified=cls.hidden_modified)
+        hidden.show_project = False
+        hidden.save()
+
+    def project(self, api_user: ApiUser) -> dict:
+        return projects_visible_to(api_user).values('artifact_count', 'last_modified', 'name').get(
+            project_uuid='project-1')
+
+    def test_last_modified_by_viewer(self):
+        self.assertEqual(self.project(ApiUser(uuid='anonymous-uuid', projects=[])),
+                         {'artifact_count': 1, 'last_modified': self.public_modified, 'name': 'project project-1'})
+        self.assertEqual(self.project(ApiUser(uuid='dave-uuid', projects=['project-1'])),
+                         {'artifact_count': 2, 'last_modified': self.private_modified, 'name': 'project project-1'})
+        # the author also counts the artifact that hides its project
+        self.assertEqual(self.project(ApiUser(uuid='alice-uuid', projects=[])),
+                         {'artifact_count': 2, 'last_modified': self.hidden_modified, 'name': 'project project-1'})
+
+    def test_api_orders_by_viewer_last_modified(self):
+        create_artifact('public-2', project_uuid='project-2',
+                        modified=self.public_modified + timedelta(hours=12))
+        init_anon_api_user()
+        response = APIClient(SERVER_NAME='127.0.0.1').get('/api/projects', {'ordering': '-last_modified'})
+        self.assertEqual(response.status_code, 200)
+        # project-1's newer private and hidden artifacts do not move it ahead of project-2 for an anonymous viewer
+        self.assertEqual([project.get('uuid') for project in response.json().get('results')], ['project-2', 'project-1'])
+
+
+
+class VerifiedTokenCacheTest(TestCase):
+    """
+    A cached verified bearer token resolves its ApiUser without any query, as a new instance per request
+    """
+
+    def setUp(self):
+        self.api_user = ApiUser.objects.create(
+            access_expires=datetime.now(timezone.utc) + timedelta(minutes=5), access_type=ApiUser.TOKEN,
+            cilogon_id='http://cilogon.org/serverA/users/1', fabric_roles=['Jupyterhub'], name='alice',
+            projects=['project-1'], uuid='alice-uuid')
+        self.token_digest = fabric_auth.get_token_digest('token')
+        self.request = RequestFactory().get('/api/artifacts', headers={'authorization': 'Bearer token'})
+        for patcher in [mock.patch.dict(fabric_auth._trl_state, {'expires': time.time() + 3600}),
+                        mock.patch.object(fabric_auth, '_verified_token_cache', fabric_auth.TTLCache(maxsize=16))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_cache_hit_without_queries(self):
+        fabric_auth.cache_verified_token(self.token_digest, self.api_user.cilogon_id, int(time.time()) + 3600,
+                                         self.api_user)
+        with self.assertNumQueries(0):
+            first = fabric_auth.resolve_api_user(self.request)
+            second = fabric_auth.resolve_api_user(self.request)
+        self.assertEqual((first.pk, first.uuid, first.projects, first.fabric_roles),
+                         (self.api_user.pk, 'alice-uuid', ['project-1'], ['Jupyterhub']))
+        self.assertIsNot(first, second)
+        first.projects.append('project-2')
+        self.assertEqual(second.projects, ['project-1'])
+        # rebuilt as a stored row: saving it updates alice
+        second.name = 'alice b'
+        second.save()
+        self.assertEqual(ApiUser.objects.get(uuid='alice-uuid').name, 'alice b')
+
+    def test_entry_ttl(self):
+        with mock.patch.dict('os.environ', {'VERIFIED_TOKEN_USER_TTL_SECONDS': '0'}):
+            fabric_auth.cache_verified_token(self.token_digest, self.api_user.cilogon_id, int(time.time()) + 3600,
+                                             self.api_user)
+        self.assertIsNone(fabric_auth.get_verified_token_user(self.token_digest))
+        # access_expires in the past: the user is re-resolved
+        self.api_user.access_expires = datetime.now(timezone.utc) - timedelta(seconds=1)
+        fabric_auth.cache_verified_token(self.token_digest, self.api_user.cilogon_id, int(time.time()) + 3600,
+                                         self.api_user)
+        self.assertIsNone(fabric_auth.get_verified_token_user(self.token_digest))
+
+
+class TokenRevocationListTest(SimpleTestCase):
+    """
+    is_token_revoked is a set lookup: its cost does not grow with the size of the token revocation list
+    """
+    LOOKUPS = 1000
+
+    @staticmethod
+    def revoked_tokens(count: int) -> list:
+        return ['revoked-token-{0}'.format(i) for i in range(count)]
+
+    def lookup_seconds(self, revoked_tokens: list) -> float:
+        """
+        Best of 5 runs of LOOKUPS is_token_revoked calls (half revoked, half not) against a TRL of revoked_tokens
+        """
+        digests = fabric_auth._index_token_revocation_list(json.dumps(
+            [hashlib.sha256(token.encode()).hexdigest() for token in revoked_tokens]))
+        self.assertEqual(len(digests), len(revoked_tokens))
+        tokens = revoked_tokens[:self.LOOKUPS // 2] + ['valid-token-{0}'.format(i) for i in range(self.LOOKUPS // 2)]
+        with mock.patch.dict(fabric_auth._trl_state, {'digests': digests, 'expires': time.time() + 3600}):
+            self.assertEqual(sum(fabric_auth.is_token_revoked(token) for token in tokens), self.LOOKUPS // 2)
+            return min(timeit.repeat(lambda: [fabric_auth.is_token_revoked(token) for token in tokens],
+                                     number=1, repeat=5))
+
+    def test_lookup_time_is_flat(self):
+        small = self.lookup_seconds(self.revoked_tokens(1000))
+        large = self.lookup_seconds(self.revoked_tokens(1000000))
+        # a linear scan of the 1M list would be ~1000x slower; allow for cache misses and timer noise
+        self.assertLess(large, small * 3, 'TRL lookups: {0:.6f}s (1k) vs {1:.6f}s (1M)'.format(small, large))
@@ -3,7 +3,6 @@ import os
 from urllib.parse import parse_qs, urlparse
 
 from django.db import models
-from django.db.models import Count, Q
 from django.http import QueryDict
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.translation import gettext_lazy as _
@@ -15,10 +14,11 @@ from artifactmgr.apps.artifacts.api.author_viewsets import AuthorViewSet
 from artifactmgr.apps.artifacts.api.validators import validate_artifact_version_create
 from artifactmgr.apps.artifacts.api.version_viewsets import ArtifactVersionViewSet
 from artifactmgr.apps.artifacts.forms import ArtifactForm
-from artifactmgr.apps.artifacts.models import Artifact
+from artifactmgr.apps.artifacts.models import Artifact, ProjectSummary
 from artifactmgr.server.settings import API_DEBUG, REST_FRAMEWORK
-from artifactmgr.utils.core_api import query_core_api_by_cookie, query_core_api_by_token
+from artifactmgr.utils.core_api import lookup_fabric_project, query_core_api_by_cookie, query_core_api_by_token
 from artifactmgr.utils.fabric_auth import get_api_user
+from artifactmgr.utils.project_summary import projects_visible_to
 
 
 class ListObjectType(models.TextChoices):
@@ -56,20 +56,8 @@ def author_list(request):
     try:
         authors = list_object_paginator(request=request, object_type=ListObjectType.AUTHORS)
         message = authors.get('message', None)
-        # Visible artifacts queryset (same filter as ArtifactViewSet.get_queryset for list)
-        visible_artifacts = Artifact.objects.filter(
-            Q(visibility=Artifact.PUBLIC) |
-            Q(project_uuid__in=api_user.projects) |
-            Q(authors__uuid__in=[api_user.uuid])
-        ).distinct()
-        # For each author on this page, count their artifacts that are also visible
-        # This mirrors the intersection logic used by ArtifactViewSet.by_author
+        # artifact_count (visible artifacts per author) is annotated by AuthorViewSet
         list_objects = authors.get('list_objects', {})
-        for author in list_objects.get('results', []):
-            authored = Artifact.objects.filter(
-                authors__uuid__in=[author.get('uuid')]
-            ).distinct()
-            author['artifact_count'] = authored.intersection(visible_artifacts).count()
     except Exception as exc:
         message = exc
         authors = {}
@@ -134,6 +122,8 @@ def artifact_detail(request, *args, **kwargs):
             v_api_request = request.POST.copy()
             v_api_request.COOKIES = request.COOKIES
             v_api_request.headers = request.headers
+            # reuse the api_user already resolved for this request
+            v_api_request._api_user = api_user
             v_api_request.data = QueryDict('', mutable=True)
             if artifact_detail_button == 'add_version':
                 v_api_request.method = 'POST'
@@ -255,26 +245,11 @@ def project_list(request):
         message = 'Search requires 3 or more characters'
         search = None
     try:
-        # Apply the same visibility filter used by ArtifactViewSet.get_queryset():
-        #   public artifacts, artifacts in the user's projects, or artifacts the user authored
-        visible_artifacts = Artifact.objects.filter(
-            Q(visibility=Artifact.PUBLIC) |
-            Q(project_uuid__in=api_user.projects) |
-            Q(authors__uuid__contains=api_user.uuid)
-        ).distinct()
-        # Exclude artifacts where show_project is False (unless user is an author),
-        # matching the redaction in ArtifactViewSet.list()
-        visible_with_project = visible_artifacts.filter(
-            Q(show_project=True) | Q(authors__uuid__in=[api_user.uuid])
-        ).distinct()
-        qs = visible_with_project.exclude(project_uuid__isnull=True).exclude(project_uuid='')
+        # Served from the materialized project catalog (ProjectSummary) with per-user counts
+        qs = projects_visible_to(api_user)
         if search:
-            qs = qs.filter(project_name__icontains=search)
-        projects = list(
-            qs.values('project_uuid', 'project_name')
-            .annotate(count=Count('uuid', distinct=True))
-            .order_by('project_name')
-        )
+            qs = qs.filter(name__icontains=search)
+        projects = list(qs.values('project_uuid', 'name', 'artifact_count').order_by('name', 'project_uuid'))
     except Exception as exc:
         message = exc
         projects = []
@@ -293,9 +268,11 @@ def project_detail(request, *args, **kwargs):
     api_user = get_api_user(request=request)
     message = None
     project_uuid = kwargs.get('uuid')
-    # Look up the project name from any artifact with this project_uuid
-    project_obj = Artifact.objects.filter(project_uuid=project_uuid).first()
-    project_name = project_obj.project_name if project_obj else project_uuid
+    # Look up the project name from the project catalog, falling back to the project cache
+    project_name = ProjectSummary.objects.filter(project_uuid=project_uuid).values_list('name', flat=True).first()
+    if not project_name:
+        project = lookup_fabric_project(request=request, api_user=api_user, uuid=project_uuid)
+        project_name = project.get('name') if project and project.get('name') else project_uuid
     try:
         kwargs.update({'uuid': project_uuid})
         artifacts = list_object_paginator(
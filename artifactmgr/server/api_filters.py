@@ -13,6 +13,18 @@ def preprocessing_filter_spec(endpoints):
             filtered.append((path, path_regex, method, callback))
         if path.endswith("/api/meta/tags") and method == 'GET':
             filtered.append((path, path_regex, method, callback))
+        # Debug endpoints
+        if path.endswith("/api/meta/debug") and method == 'GET':
+            filtered.append((path, path_regex, method, callback))
+        # Project endpoints
+        if path.startswith("/api/projects") and method == 'GET':
+            filtered.append((path, path_regex, method, callback))
+        # Stats endpoints
+        if path.endswith("/api/meta/stats") and method == 'GET':
+            filtered.append((path, path_regex, method, callback))
+        # Suggest endpoints
+        if path.endswith("/api/suggest") and method == 'GET':
+            filtered.append((path, path_regex, method, callback))
         # Version endpoints
         if path.endswith("/api/contents"):
             filtered.append((path, path_regex, method, callback))
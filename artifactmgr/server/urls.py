@@ -21,6 +21,10 @@ from rest_framework import routers
 
 from artifactmgr.apps.artifacts.api.artifact_viewsets import ArtifactViewSet
 from artifactmgr.apps.artifacts.api.author_viewsets import AuthorViewSet
+from artifactmgr.apps.artifacts.api.debug_viewsets import DebugViewSet
+from artifactmgr.apps.artifacts.api.project_viewsets import ProjectViewSet
+from artifactmgr.apps.artifacts.api.stats_viewsets import StatsViewSet
+from artifactmgr.apps.artifacts.api.suggest_viewsets import SuggestViewSet
 from artifactmgr.apps.artifacts.api.tag_viewsets import TagViewSet
 from artifactmgr.apps.artifacts.api.version_viewsets import ArtifactVersionViewSet
 from artifactmgr.server.views import landing_page
@@ -29,7 +33,11 @@ router = routers.DefaultRouter(trailing_slash=False)
 router.register(r'authors', AuthorViewSet, basename='authors')
 router.register(r'artifacts', ArtifactViewSet, basename='artifacts')
 router.register(r'contents', ArtifactVersionViewSet, basename='contents')
+router.register(r'projects', ProjectViewSet, basename='projects')
 router.register(r'meta/tags', TagViewSet, basename='tags')
+router.register(r'meta/stats', StatsViewSet, basename='stats')
+router.register(r'meta/debug', DebugViewSet, basename='debug')
+router.register(r'suggest', SuggestViewSet, basename='suggest')
 
 # Wire up our API using automatic URL routing.
 # Additionally, we include login URLs for the browsable API.
@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactAccess
+
+"""
+Materialized artifact visibility (ArtifactAccess)
+    - principals of an artifact: ArtifactAccess.PUBLIC_PRINCIPAL when visibility is public, its project_uuid (when
+      set) and the uuid of each of its authors
+    - kept in sync by the artifacts signals (artifact save, authors M2M changes) inside the writing transaction
+    - rebuild_artifact_access recomputes every artifact (backfill / consistency check)
+"""
+
+
+def _expected_principals(artifact_uuids=None) -> dict:
+    """
+    {artifact_uuid: {principal, ...}} computed from visibility, project_uuid and the authors M2M
+    - artifact_uuids None - all artifacts
+    """
+    artifacts = Artifact.objects.all()
+    authors = Artifact.authors.through.objects.all()
+    if artifact_uuids is not None:
+        artifacts = artifacts.filter(uuid__in=artifact_uuids)
+        authors = authors.filter(artifact_id__in=artifact_uuids)
+    expected = defaultdict(set)
+    for uuid, visibility, project_uuid in artifacts.values_list('uuid', 'visibility', 'project_uuid').order_by():
+        principals = expected[uuid]
+        if visibility == Artifact.PUBLIC:
+            principals.add(ArtifactAccess.PUBLIC_PRINCIPAL)
+        if project_uuid:
+            principals.add(project_uuid)
+    for artifact_uuid, author_uuid in authors.values_list('artifact_id', 'artifactauthor_id'):
+        if artifact_uuid in expected:
+            expected[artifact_uuid].add(author_uuid)
+    return expected
+
+
+def _sync(expected: dict, artifact_uuids=None, dry_run: bool = False) -> dict:
+    existing = ArtifactAccess.objects.all()
+    if artifact_uuids is not None:
+        existing = existing.filter(artifact_id__in=artifact_uuids)
+    stale = []
+    current = defaultdict(set)
+    for pk, artifact_uuid, principal in existing.values_list('pk', 'artifact_id', 'principal'):
+        if principal in expected.get(artifact_uuid, ()):
+            current[artifact_uuid].add(principal)
+        else:
+            stale.append(pk)
+    missing = [
+        ArtifactAccess(artifact_id=artifact_uuid, principal=principal)
+        for artifact_uuid, principals in expected.items()
+        for principal in principals - current.get(artifact_uuid, set())
+    ]
+    if not dry_run:
+        if stale:
+            ArtifactAccess.objects.filter(pk__in=stale).delete()
+        if missing:
+            ArtifactAccess.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+    return {'artifacts': len(expected), 'missing': len(missing), 'stale': len(stale)}
+
+
+@transaction.atomic
+def sync_artifact_access(artifact_uuids) -> dict:
+    """
+    Bring the ArtifactAccess rows of the given artifacts in line with their visibility, project and authors
+    """
+    artifact_uuids = list(artifact_uuids)
+    return _sync(_expected_principals(artifact_uuids), artifact_uuids=artifact_uuids)
+
+
+@transaction.atomic
+def rebuild_artifact_access(dry_run: bool = False) -> dict:
+    """
+    Recompute ArtifactAccess for all artifacts, returns the number of missing / stale rows found
+    - dry_run - only report the differences (consistency check)
+    """
+    return _sync(_expected_principals(), dry_run=dry_run)
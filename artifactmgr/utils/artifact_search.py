@@ -0,0 +1,76 @@
+import os
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, StringAgg, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+from artifactmgr.apps.artifacts.models import Artifact
+
+"""
+PostgreSQL full-text search over artifacts
+    - Artifact.search_vector (GIN indexed) holds the weighted document:
+      A - title, B - description_short and tags, C - project_name, D - description_long
+    - kept up to date by the artifacts signals (artifact save, tags M2M changes) with a single UPDATE
+    - ?search= is parsed with websearch_to_tsquery ("quoted phrases", or, -exclude) and ranked with ts_rank
+    - SEARCH_CONFIG selects the text search configuration (default: english)
+"""
+
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'english')
+
+# Artifact fields that the search document is built from (besides the tags M2M)
+SEARCH_FIELDS = {'description_long', 'description_short', 'project_name', 'title'}
+
+
+def _search_document() -> SearchVector:
+    tags = Coalesce(Subquery(
+        Artifact.tags.through.objects.filter(
+            artifact_id=OuterRef('pk')
+        ).values('artifact_id').annotate(
+            tags=StringAgg('artifacttag_id', delimiter=Value(' '))
+        ).values('tags')[:1]
+    ), Value(''), output_field=TextField())
+    return (
+            SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+            SearchVector('description_short', weight='B', config=SEARCH_CONFIG) +
+            SearchVector(tags, weight='B', config=SEARCH_CONFIG) +
+            SearchVector('project_name', weight='C', config=SEARCH_CONFIG) +
+            SearchVector('description_long', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(artifact_uuids) -> int:
+    """
+    Recompute search_vector for the given artifacts with a single UPDATE, returns the number of artifacts updated
+    """
+    return Artifact.objects.filter(uuid__in=artifact_uuids).update(search_vector=_search_document())
+
+
+def rebuild_search_vectors(rebuild_all: bool = False, batch_size: int = 500) -> int:
+    """
+    Backfill search_vector, returns the number of artifacts updated
+    - rebuild_all - recompute every artifact (e.g. after changing SEARCH_CONFIG), otherwise only those without one
+    """
+    artifacts = Artifact.objects.all() if rebuild_all else Artifact.objects.filter(search_vector__isnull=True)
+    artifact_uuids = list(artifacts.values_list('uuid', flat=True).order_by())
+    updated = 0
+    for i in range(0, len(artifact_uuids), batch_size):
+        updated += update_search_vectors(artifact_uuids[i:i + batch_size])
+    return updated
+
+
+def search_artifacts(queryset, search: str, headline: bool = False):
+    """
+    Filter an Artifact queryset by a websearch query, ordered by rank (then by the queryset's own ordering)
+    - headline - annotate search_headline, a highlighted snippet of description_long
+    """
+    query = SearchQuery(search, search_type='websearch', config=SEARCH_CONFIG)
+    queryset = queryset.filter(
+        search_vector=query
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', *queryset.query.order_by)
+    if headline:
+        queryset = queryset.annotate(
+            search_headline=SearchHeadline('description_long', query, config=SEARCH_CONFIG, max_fragments=2,
+                                           start_sel='<mark>', stop_sel='</mark>'))
+    return queryset
@@ -0,0 +1,136 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import CharField, Count, F, Max, Q, StringAgg, Value
+from django.db.models.functions import Cast, Concat, MD5
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from artifactmgr.apps.apiuser.models import ApiUser
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactVersion, CatalogVersion
+
+"""
+Conditional GET (ETag / Last-Modified) for the artifact, version and tag read endpoints
+    - validators are computed from cheap metadata queries before serialization, a matching If-None-Match /
+      If-Modified-Since is answered with 304 without building the body
+    - artifact and version lists are keyed on the CatalogVersion stamp (one primary key read), incremented by the
+      artifacts signals in every transaction that changes an artifact, version, author / tag link or author profile
+    - single artifacts / versions are validated by their own rows (and also send Last-Modified); the tag list by a
+      digest of the (small) tags table
+    - approximate usage counters (views, downloads, unique viewers / downloaders) are not part of any validator:
+      ETags are weak (W/"...") and a view or download never invalidates a cached body
+    - ETags include the viewer's visibility class, so a body serialized for one class of viewer (e.g. authors, who
+      see fields redacted for everyone else) never validates for another
+    - responses carry Vary: Authorization, Cookie and Cache-Control: no-cache (and private for signed-in users) so
+      shared caches always revalidate and never hand one viewer's body to another
+"""
+
+
+def make_etag(*parts) -> str:
+    return 'W/"{0}"'.format(hashlib.sha256(repr(parts).encode()).hexdigest()[:32])
+
+
+def principals_class(api_user: ApiUser) -> str:
+    """
+    Visibility class of a list: viewers with the same principals (uuid and projects) see the same artifacts
+    """
+    if not api_user.is_authenticated:
+        return 'anonymous'
+    return hashlib.sha256(repr((api_user.uuid, sorted(api_user.projects))).encode()).hexdigest()[:16]
+
+
+def catalog_version(name: str = CatalogVersion.ARTIFACTS) -> int:
+    return CatalogVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def bump_catalog_version(name: str = CatalogVersion.ARTIFACTS) -> None:
+    """
+    Invalidate the list ETags keyed on name (called by the artifacts signals inside the writing transaction)
+    """
+    if not CatalogVersion.objects.filter(name=name).update(version=F('version') + 1):
+        CatalogVersion.objects.bulk_create([CatalogVersion(name=name, version=1)], ignore_conflicts=True)
+
+
+def list_validators(viewer_class: str, request_path: str, name: str = CatalogVersion.ARTIFACTS) -> tuple:
+    """
+    (etag, None) of a list response - the CatalogVersion stamp, the viewer's visibility class and the request path
+    (filters, search, page / cursor); lists send no Last-Modified as deletions and visibility changes do not advance
+    any timestamp
+    """
+    return make_etag(viewer_class, request_path, name, catalog_version(name)), None
+
+
+def artifact_validators(artifacts, viewer_class: str) -> tuple | None:
+    """
+    (etag, last_modified) of a single artifact as serialized by ArtifactSerializer, None when not found / visible
+    - the artifact row, its versions, its author / tag links and the authors' profiles (refreshed from core-api)
+    """
+    meta = artifacts.aggregate(count=Count('pk'), modified=Max('modified'))
+    if not meta.get('count'):
+        return None
+    pks = artifacts.values('pk')
+    versions = version_metadata(ArtifactVersion.objects.filter(artifact_id__in=pks))
+    authors = Artifact.authors.through.objects.filter(artifact_id__in=pks).aggregate(
+        count=Count('pk'), updated=Max('artifactauthor__updated'))
+    tags = Artifact.tags.through.objects.filter(artifact_id__in=pks).count()
+    last_modified = max(dt for dt in [meta.get('modified'), versions.get('created'), authors.get('updated')] if dt)
+    return make_etag(viewer_class, meta, versions, authors, tags), last_modified
+
+
+def version_metadata(versions) -> dict:
+    """
+    Versions are immutable once created except for active (and the download counters, left out)
+    """
+    return versions.aggregate(
+        active=Count('pk', filter=Q(active=True)),
+        count=Count('pk'),
+        created=Max('created')
+    )
+
+
+def version_validators(versions, viewer_class: str) -> tuple | None:
+    """
+    (etag, last_modified) of a single version as serialized by ArtifactVersionSerializer, None when not found
+    """
+    meta = version_metadata(versions)
+    if not meta.get('count'):
+        return None
+    return make_etag(viewer_class, meta), meta.get('created')
+
+
+def tag_validators(tags, viewer_class: str, request_path: str = '') -> tuple:
+    """
+    (etag, None) of an ArtifactTag queryset - tags carry no timestamp, the ETag hashes every (tag, restricted) pair
+    """
+    meta = tags.aggregate(
+        count=Count('pk'),
+        digest=MD5(StringAgg(Concat('tag', Value(':'), Cast('restricted', output_field=CharField())),
+                             delimiter=Value(','), order_by='tag'))
+    )
+    return make_etag(viewer_class, request_path, meta), None
+
+
+def conditional_response(request, api_user: ApiUser, validators: tuple | None, build):
+    """
+    304 Not Modified when the request's If-None-Match / If-Modified-Since match validators, otherwise build()
+    - validators - (etag, last_modified) or None (no conditional handling, e.g. not found / not visible)
+    - build - callable returning the full response, only called when the client's copy is stale
+    """
+    if not validators:
+        return build()
+    etag, last_modified = validators
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    if api_user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
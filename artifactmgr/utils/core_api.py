@@ -1,14 +1,27 @@
 import os
+import threading
+from datetime import datetime, timedelta, timezone
 
 import requests
 
 from artifactmgr.apps.apiuser.models import ApiUser
+from artifactmgr.apps.artifacts.models import FabricProject
+from artifactmgr.utils.http_client import get_timeout, http_get
+from artifactmgr.utils.local_cache import TTLCache
 
 # Outcomes for lookup_fabric_person(); distinguishes a genuinely missing user from a failed call.
 PERSON_FOUND = 'found'
 PERSON_NOT_FOUND = 'not_found'
 PERSON_LOOKUP_FAILED = 'lookup_failed'
 
+# per-worker cache of person lookups: uuid -> (outcome, person); PERSON_LOOKUP_FAILED is never cached
+_person_cache = TTLCache(maxsize=int(os.getenv('PERSON_CACHE_SIZE', 2048)))
+# single-flight: uuid -> {'done': threading.Event, 'result': (outcome, person)} for lookups in progress
+_person_lookups = {}
+_person_lookups_lock = threading.Lock()
+# per-worker cache of project metadata: uuid -> {'uuid', 'name'}; projects that are not found are never cached
+_project_cache = TTLCache(maxsize=int(os.getenv('PROJECT_CACHE_SIZE', 1024)))
+
 
 class BearerAuth(requests.auth.AuthBase):
     def __init__(self, token):
@@ -23,15 +36,13 @@ def query_core_api_by_cookie(query: str, cookie: str):
     """
     Issue a simple GET query against core-api using cookie auth
     """
-    s = requests.Session()
     response = None
     try:
-        s.cookies.set(os.getenv('VOUCH_COOKIE_NAME'), cookie)
-        api_call = s.get(url=os.getenv('FABRIC_CORE_API') + query)
+        api_call = http_get(url=os.getenv('FABRIC_CORE_API') + query,
+                            cookies={os.getenv('VOUCH_COOKIE_NAME'): cookie} if cookie else None)
         response = api_call.json()
     except Exception as exc:
         print(exc)
-    s.close()
     return response
 
 
@@ -39,15 +50,12 @@ def query_core_api_by_token(query: str, token: str):
     """
     Issue a simple GET query against core-api using token auth
     """
-    s = requests.Session()
     response = None
     try:
-        s.auth = BearerAuth(token=token)
-        api_call = s.get(url=os.getenv('FABRIC_CORE_API') + query)
+        api_call = http_get(url=os.getenv('FABRIC_CORE_API') + query, auth=BearerAuth(token=token))
         response = api_call.json()
     except Exception as exc:
         print(exc)
-    s.close()
     return response
 
 
@@ -66,6 +74,44 @@ def lookup_fabric_person(request, api_user: ApiUser, uuid: str) -> tuple:
     GET /people/{uuid} returns any existing person (200, size 1) regardless of their
     profile-visibility settings, so an empty/failed result means the call failed, not
     that the person does not exist.
+
+    Results are cached per worker (PERSON_FOUND for PERSON_CACHE_TTL_SECONDS, PERSON_NOT_FOUND for
+    PERSON_CACHE_NEGATIVE_TTL_SECONDS) and concurrent lookups of the same uuid share a single core-api call.
+    PERSON_LOOKUP_FAILED is never cached.
+    """
+    result = _person_cache.get(uuid)
+    if result:
+        return result
+    with _person_lookups_lock:
+        lookup = _person_lookups.get(uuid)
+        is_leader = lookup is None
+        if is_leader:
+            lookup = _person_lookups[uuid] = {'done': threading.Event(), 'result': None}
+    if not is_leader:
+        # another thread is already asking core-api for this uuid: wait for its answer; a failed lookup
+        # may be specific to the other caller's credential, so retry with our own in that case
+        lookup['done'].wait(timeout=sum(get_timeout()))
+        result = lookup['result']
+        if result and result[0] != PERSON_LOOKUP_FAILED:
+            return result
+        return _query_fabric_person(request=request, api_user=api_user, uuid=uuid)
+    try:
+        result = _query_fabric_person(request=request, api_user=api_user, uuid=uuid)
+        if result[0] == PERSON_FOUND:
+            _person_cache.set(uuid, result, ttl=int(os.getenv('PERSON_CACHE_TTL_SECONDS', 300)))
+        elif result[0] == PERSON_NOT_FOUND:
+            _person_cache.set(uuid, result, ttl=int(os.getenv('PERSON_CACHE_NEGATIVE_TTL_SECONDS', 60)))
+        lookup['result'] = result
+    finally:
+        with _person_lookups_lock:
+            _person_lookups.pop(uuid, None)
+        lookup['done'].set()
+    return result
+
+
+def _query_fabric_person(request, api_user: ApiUser, uuid: str) -> tuple:
+    """
+    Uncached GET /people/{uuid} against core-api (see lookup_fabric_person)
     """
     query = '/people/{0}?as_self=false'.format(uuid)
     if api_user.access_type == ApiUser.COOKIE:
@@ -85,3 +131,61 @@ def lookup_fabric_person(request, api_user: ApiUser, uuid: str) -> tuple:
     if status == 404:
         return PERSON_NOT_FOUND, None
     return PERSON_LOOKUP_FAILED, None
+
+
+def project_cache_persist_enabled() -> bool:
+    return os.getenv('PROJECT_CACHE_PERSIST', 'true').casefold() == 'true'
+
+
+def lookup_fabric_project(request, api_user: ApiUser, uuid: str) -> dict | None:
+    """
+    Resolve FABRIC project metadata by uuid, returns {'uuid', 'name'} or None when the project cannot be found
+    - request scope: the project is looked up at most once per request (validators and viewsets share the result)
+    - per-worker cache for PROJECT_CACHE_TTL_SECONDS
+    - FabricProject table (PROJECT_CACHE_PERSIST=true): rows updated within PROJECT_CACHE_TTL_SECONDS are used as stored
+    - core-api GET /projects/{uuid} using the request's credential (authenticated users only)
+    """
+    scope = getattr(request, '_request', request)
+    projects = getattr(scope, '_fabric_projects', None)
+    if projects is None:
+        projects = scope._fabric_projects = {}
+    if uuid not in projects:
+        project = _project_cache.get(uuid)
+        if project is None:
+            project = _load_fabric_project(request=request, api_user=api_user, uuid=uuid)
+        projects[uuid] = project
+    return projects[uuid]
+
+
+def _load_fabric_project(request, api_user: ApiUser, uuid: str) -> dict | None:
+    """
+    Uncached project lookup: FabricProject table, then core-api (see lookup_fabric_project)
+    """
+    now = datetime.now(timezone.utc)
+    ttl = int(os.getenv('PROJECT_CACHE_TTL_SECONDS', 3600))
+    persist = project_cache_persist_enabled()
+    if persist:
+        stored = FabricProject.objects.filter(uuid=uuid, updated__gt=now - timedelta(seconds=ttl)).first()
+        if stored:
+            project = {'uuid': stored.uuid, 'name': stored.name}
+            _project_cache.set(uuid, project, ttl=(stored.updated + timedelta(seconds=ttl) - now).total_seconds())
+            return project
+    if not api_user.is_authenticated:
+        return None
+    query = '/projects/{0}'.format(uuid)
+    if api_user.access_type == ApiUser.COOKIE:
+        response = query_core_api_by_cookie(
+            query=query, cookie=request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None))
+    else:
+        response = query_core_api_by_token(
+            query=query, token=request.headers.get('authorization', 'Bearer ').replace('Bearer ', ''))
+    if not isinstance(response, dict) or response.get('status') != 200 or response.get('size') != 1:
+        return None
+    project = {'uuid': uuid, 'name': (response.get('results') or [{}])[0].get('name', None)}
+    _project_cache.set(uuid, project, ttl=ttl)
+    if persist:
+        try:
+            FabricProject.objects.update_or_create(uuid=uuid, defaults={'name': project.get('name')})
+        except Exception as exc:
+            print(exc)
+    return project
@@ -3,16 +3,53 @@ import gzip
 import hashlib
 import json
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
-import requests
 
 from artifactmgr.apps.apiuser.models import ApiUser, TaskTimeoutTracker
+from artifactmgr.utils.http_client import http_get
+from artifactmgr.utils.local_cache import TTLCache
+
+# per-worker cache of the credmgr JWKS indexed by kid (see get_public_signing_key)
+_jwks_lock = threading.Lock()
+_jwks_cache = {
+    'keys': {},
+    'expires': 0.0,
+    'last_forced_refresh': 0.0,
+}
+
+# per-worker cache of verified bearer tokens: sha256(token) -> (oidc_sub, exp, db alias, ApiUser field values)
+# - entries also expire at the user's access_expires and after VERIFIED_TOKEN_USER_TTL_SECONDS, so that changes to
+#   the ApiUser row (e.g. refreshed projects) are picked up within that many seconds
+_verified_token_cache = TTLCache(maxsize=int(os.getenv('VERIFIED_TOKEN_CACHE_SIZE', 4096)))
+
+# per-worker cache of decoded Vouch cookies: blake2b(cookie) -> oidc_sub, kept until the Vouch JWT exp
+_vouch_cookie_cache = TTLCache(maxsize=int(os.getenv('VOUCH_COOKIE_CACHE_SIZE', 4096)))
+
+# per-worker token revocation list (TRL) as a frozenset of sha256 token digests
+# - version - tracker last_updated of the loaded TRL
+# - expires - wall-clock time (epoch seconds) at which the TRL is next refreshed
+_trl_lock = threading.Lock()
+_trl_state = {
+    'digests': frozenset(),
+    'version': None,
+    'expires': 0.0,
+}
 
 
 def get_oidc_sub_from_cookie(cookie: str) -> str | None:
+    """
+    Decode the Vouch cookie (base64 -> gzip -> HS256 JWT) and return the OIDC sub
+    - decoded subs are cached per worker by a blake2b digest of the cookie until the Vouch JWT exp
+    """
+    cookie_digest = hashlib.blake2b(cookie.encode(), digest_size=16).digest()
+    oidc_sub = _vouch_cookie_cache.get(cookie_digest)
+    if oidc_sub:
+        return oidc_sub
     try:
         # get base64 encoded gzipped vouch JWT
         base64_encoded_gzip_vouch_jwt = cookie
@@ -31,38 +68,163 @@ def get_oidc_sub_from_cookie(cookie: str) -> str | None:
         )
         # vouch_jwt holder for decoded JWT
         oidc_sub = vouch_json.get('CustomClaims').get('sub')
+        # cache until the JWT expires (a JWT without exp is not cached)
+        if oidc_sub and vouch_json.get('exp'):
+            _vouch_cookie_cache.set(cookie_digest, oidc_sub, ttl=int(vouch_json.get('exp')) - time.time())
         return oidc_sub
     except Exception as exc:
         print(exc)
         return None
 
 
-def get_oidc_sub_from_token(token: str) -> str | None:
-    s = requests.Session()
+def get_auth_cache_stats() -> dict:
+    """
+    Per-worker authentication cache statistics (size, hits, misses, evictions, hit_rate)
+    - verified_tokens - bearer tokens verified against the credmgr JWKS
+    - vouch_cookies - decoded Vouch cookies
+    """
+    return {
+        'verified_tokens': _verified_token_cache.stats(),
+        'vouch_cookies': _vouch_cookie_cache.stats()
+    }
+
+
+def _index_jwks(value: str | None) -> dict:
+    """
+    Index a stored JWKS value by kid
+    - accepts a JWKS document ({'keys': [...]}), a list of JWKs, or a single JWK (legacy PSK value)
+    """
+    jwks = json.loads(value) if value else []
+    if isinstance(jwks, dict):
+        jwks = jwks.get('keys', [jwks])
+    return {jwk.get('kid'): jwt.PyJWK(jwk) for jwk in jwks}
+
+
+def tracker_refresher_enabled() -> bool:
+    """
+    True when TaskTimeoutTracker values are kept warm by `manage.py run_tracker_refresher`
+    - request handlers then only read stored values, except for the (rate limited) forced PSK refresh on an unknown kid
+    """
+    return str(os.getenv('TRACKER_REFRESHER_ENABLED', 'false')).casefold() == 'true'
+
+
+def _tracker_expires_in(tracker: TaskTimeoutTracker) -> float:
+    """
+    Seconds until tracker times out; a stale tracker is re-read at the refresher interval when the refresher is enabled
+    """
+    ttl = (tracker.last_updated + timedelta(seconds=int(tracker.timeout_in_seconds)) - datetime.now(timezone.utc))
+    if tracker_refresher_enabled():
+        return max(ttl.total_seconds(), int(os.getenv('TRACKER_REFRESHER_INTERVAL_SECONDS', 30)))
+    return max(ttl.total_seconds(), 0)
+
+
+def refresh_public_signing_key(psk: TaskTimeoutTracker) -> None:
+    """
+    Fetch all public signing keys from /credmgr/certs and store them on the PSK tracker
+    """
+    api_call = http_get(url=os.getenv('FABRIC_CREDENTIAL_MANAGER') + '/credmgr/certs')
+    psk.value = json.dumps(api_call.json().get('keys'))
+    psk.last_updated = datetime.now(timezone.utc)
+    psk.save(update_fields=['value', 'last_updated'])
+
+
+def load_public_signing_keys(force_refresh: bool = False) -> None:
+    """
+    Populate the per-worker JWKS cache from the public signing key (PSK) tracker
+    - fetch all keys from /credmgr/certs when the tracker has timed out (left to the refresher when it is enabled)
+    - force_refresh fetches with or without the refresher, so rotated keys are picked up right away, unless another
+      worker stored keys within the last PSK_REFRESH_MIN_INTERVAL_SECONDS (per worker it is rate limited by
+      get_public_signing_key)
+    - cache entries live until the tracker itself times out
+    """
+    psk = TaskTimeoutTracker.objects.get(name=os.getenv('PSK_NAME'))
+    if force_refresh:
+        force_refresh = psk.last_updated + timedelta(
+            seconds=int(os.getenv('PSK_REFRESH_MIN_INTERVAL_SECONDS', 60))) <= datetime.now(timezone.utc)
+    if force_refresh or (not tracker_refresher_enabled() and (psk.timed_out() or not psk.value)):
+        refresh_public_signing_key(psk)
+    _jwks_cache['keys'] = _index_jwks(psk.value)
+    _jwks_cache['expires'] = time.monotonic() + _tracker_expires_in(psk)
+
+
+def get_public_signing_key(kid: str | None) -> jwt.PyJWK | None:
+    """
+    Return the public signing key for kid from the per-worker JWKS cache
+    - tokens without a kid are verified against the first published key
+    - an unknown kid triggers a (rate limited) refresh from credmgr to pick up rotated keys
+    """
+    with _jwks_lock:
+        now = time.monotonic()
+        if now >= _jwks_cache['expires']:
+            load_public_signing_keys()
+        keys = _jwks_cache['keys']
+        key = keys.get(kid) if kid else next(iter(keys.values()), None)
+        if key is None and now - _jwks_cache['last_forced_refresh'] >= int(
+                os.getenv('PSK_REFRESH_MIN_INTERVAL_SECONDS', 60)):
+            _jwks_cache['last_forced_refresh'] = now
+            load_public_signing_keys(force_refresh=True)
+            keys = _jwks_cache['keys']
+            key = keys.get(kid) if kid else next(iter(keys.values()), None)
+    return key
+
+
+def get_claims_from_token(token: str) -> dict | None:
+    """
+    Verify a credmgr issued bearer token (RS256) and return its claims
+    """
     try:
-        psk = TaskTimeoutTracker.objects.get(name=os.getenv('PSK_NAME'))
-        if not psk.timed_out():
-            public_signing_key = jwt.PyJWK(json.loads(psk.value)).key
-        else:
-            api_call = s.get(url=os.getenv('FABRIC_CREDENTIAL_MANAGER') + '/credmgr/certs')
-            jwks = api_call.json().get('keys')[0]
-            public_signing_key = jwt.PyJWK(jwks).key
-            psk.value = json.dumps(jwks)
-            psk.last_updated = datetime.now(timezone.utc)
-            psk.save()
+        kid = jwt.get_unverified_header(token).get('kid')
+        public_signing_key = get_public_signing_key(kid=kid)
+        if not public_signing_key:
+            raise jwt.PyJWKError('unable to find a public signing key for kid: {0}'.format(kid))
         token_json = jwt.decode(
             jwt=token,
-            key=public_signing_key,
+            key=public_signing_key.key,
             algorithms=["RS256"],
             options={"verify_aud": False}
         )
-        oidc_sub = token_json.get('sub')
     except Exception as exc:
         print(exc)
-        oidc_sub = None
+        token_json = None
+    return token_json
+
+
+def get_oidc_sub_from_token(token: str) -> str | None:
+    token_json = get_claims_from_token(token=token)
+    return token_json.get('sub') if token_json else None
+
+
+def get_token_digest(token: str) -> str:
+    token_hash = hashlib.new('sha256')
+    token_hash.update(token.encode())
+    return token_hash.hexdigest()
 
-    s.close()
-    return oidc_sub
+
+def cache_verified_token(token_digest: str, oidc_sub: str, exp: int | None, api_user: ApiUser) -> None:
+    """
+    Remember a verified token and its resolved api_user (field values, not the instance)
+    - the entry expires at the earliest of: the token's exp, the next TRL refresh, the user's access_expires and
+      VERIFIED_TOKEN_USER_TTL_SECONDS from now
+    """
+    if not exp or not api_user.is_authenticated or not api_user.access_expires:
+        return
+    now = time.time()
+    ttl = min(float(exp), _trl_state['expires'], api_user.access_expires.timestamp(),
+              now + float(os.getenv('VERIFIED_TOKEN_USER_TTL_SECONDS', 60))) - now
+    values = tuple(getattr(api_user, field.attname) for field in ApiUser._meta.concrete_fields)
+    _verified_token_cache.set(token_digest, (oidc_sub, exp, api_user._state.db, values), ttl=ttl)
+
+
+def get_verified_token_user(token_digest: str) -> ApiUser | None:
+    """
+    ApiUser of a cached verified token, rebuilt without a query (a new instance per request), or None
+    """
+    verified_token = _verified_token_cache.get(token_digest)
+    if not verified_token:
+        return None
+    _, _, db, values = verified_token
+    return ApiUser.from_db(db, [field.attname for field in ApiUser._meta.concrete_fields],
+                           [list(value) if isinstance(value, list) else value for value in values])
 
 
 def auth_user_by_cookie(cookie: str) -> ApiUser:
@@ -71,17 +233,17 @@ def auth_user_by_cookie(cookie: str) -> ApiUser:
     - get user uuid from core-api using cookie
     - with user uuid populate user information from core-api /people/{uuid}?as_self=true
     """
-    s = requests.Session()
     try:
-        s.cookies.set(os.getenv('VOUCH_COOKIE_NAME'), cookie)
-        whoami = s.get(url=os.getenv('FABRIC_CORE_API') + '/whoami')
+        cookies = {os.getenv('VOUCH_COOKIE_NAME'): cookie}
+        whoami = http_get(url=os.getenv('FABRIC_CORE_API') + '/whoami', cookies=cookies)
         api_user_uuid = whoami.json().get('results', [])[0].get('uuid', os.getenv('API_USER_ANON_UUID'))
         if api_user_uuid and api_user_uuid != os.getenv('API_USER_ANON_UUID'):
             api_user = ApiUser.objects.filter(uuid=api_user_uuid).first()
             if not api_user:
                 api_user = ApiUser()
             api_user.uuid = api_user_uuid
-            fab_person = s.get(url=os.getenv('FABRIC_CORE_API') + '/people/{0}?as_self=true'.format(api_user.uuid))
+            fab_person = http_get(url=os.getenv('FABRIC_CORE_API') + '/people/{0}?as_self=true'.format(api_user.uuid),
+                                  cookies=cookies)
             api_user.affiliation = fab_person.json().get('results', [])[0].get('affiliation')
             api_user.email = fab_person.json().get('results', [])[0].get('email')
             api_user.name = fab_person.json().get('results', [])[0].get('name')
@@ -103,7 +265,6 @@ def auth_user_by_cookie(cookie: str) -> ApiUser:
     except Exception as exc:
         print(exc)
         api_user = ApiUser.objects.filter(uuid=os.getenv('API_USER_ANON_UUID')).first()
-    s.close()
     return api_user
 
 
@@ -113,17 +274,17 @@ def auth_user_by_token(token):
     - get user uuid from core-api using cookie
     - with user uuid populate user information from core-api /people/{uuid}?as_self=true
     """
-    s = requests.Session()
     try:
-        s.headers['Authorization'] = 'Bearer {0}'.format(token)
-        whoami = s.get(url=os.getenv('FABRIC_CORE_API') + '/whoami')
+        headers = {'Authorization': 'Bearer {0}'.format(token)}
+        whoami = http_get(url=os.getenv('FABRIC_CORE_API') + '/whoami', headers=headers)
         api_user_uuid = whoami.json().get('results', [])[0].get('uuid', os.getenv('API_USER_ANON_UUID'))
         if api_user_uuid and api_user_uuid != os.getenv('API_USER_ANON_UUID'):
             api_user = ApiUser.objects.filter(uuid=api_user_uuid).first()
             if not api_user:
                 api_user = ApiUser()
             api_user.uuid = api_user_uuid
-            fab_person = s.get(url=os.getenv('FABRIC_CORE_API') + '/people/{0}?as_self=true'.format(api_user.uuid))
+            fab_person = http_get(url=os.getenv('FABRIC_CORE_API') + '/people/{0}?as_self=true'.format(api_user.uuid),
+                                  headers=headers)
             api_user.affiliation = fab_person.json().get('results', [])[0].get('affiliation')
             api_user.email = fab_person.json().get('results', [])[0].get('email')
             api_user.name = fab_person.json().get('results', [])[0].get('name')
@@ -145,7 +306,6 @@ def auth_user_by_token(token):
     except Exception as exc:
         print(exc)
         api_user = ApiUser.objects.filter(uuid=os.getenv('API_USER_ANON_UUID')).first()
-    s.close()
     return api_user
 
 
@@ -155,9 +315,7 @@ def is_token_revoked(token: str) -> bool:
     """
     revocation_list = get_token_revocation_list()
     try:
-        token_hash = hashlib.new('sha256')
-        token_hash.update(token.encode())
-        if token_hash.hexdigest() in revocation_list:
+        if hashlib.sha256(token.encode()).digest() in revocation_list:
             return True
     except Exception as exc:
         print(exc)
@@ -165,26 +323,52 @@ def is_token_revoked(token: str) -> bool:
     return False
 
 
-def get_token_revocation_list() -> [str]:
+def _index_token_revocation_list(value: str | None) -> frozenset:
+    """
+    Convert a stored TRL (JSON list of sha256 hex digests) into a set of 32-byte digests
+    """
+    digests = set()
+    for token_digest in json.loads(value) if value else []:
+        try:
+            digests.add(bytes.fromhex(token_digest))
+        except (TypeError, ValueError):
+            print('invalid TRL entry: {0}'.format(token_digest))
+    return frozenset(digests)
+
+
+def refresh_token_revocation_list(trl: TaskTimeoutTracker) -> None:
+    """
+    Fetch the Token Revocation List (TRL) from /credmgr/tokens/revoke_list and store it on the TRL tracker
+    """
+    api_call = http_get(url=os.getenv('FABRIC_CREDENTIAL_MANAGER') + '/credmgr/tokens/revoke_list')
+    trl.value = json.dumps(api_call.json().get('data'))
+    trl.last_updated = datetime.now(timezone.utc)
+    trl.save(update_fields=['value', 'last_updated'])
+
+
+def get_token_revocation_list() -> frozenset:
     """
     Retrieve Token Revocation List (TRL) from CM at some interval
+    - each worker keeps the TRL as a frozenset of sha256 digests until the tracker times out
+    - the tracker's last_updated is the TRL version; the set is only rebuilt when it changes
     """
-    s = requests.Session()
-    try:
-        trl = TaskTimeoutTracker.objects.get(name=os.getenv('TRL_NAME'))
-        if not trl.timed_out():
-            token_revocation_list = json.loads(trl.value)
-        else:
-            api_call = s.get(url=os.getenv('FABRIC_CREDENTIAL_MANAGER') + '/credmgr/tokens/revoke_list')
-            token_revocation_list = api_call.json().get('data')
-            trl.value = json.dumps(token_revocation_list)
-            trl.last_updated = datetime.now(timezone.utc)
-            trl.save()
-    except Exception as exc:
-        print(exc)
-        token_revocation_list = []
-    s.close()
-    return list(token_revocation_list)
+    with _trl_lock:
+        if time.time() < _trl_state['expires']:
+            return _trl_state['digests']
+        try:
+            trl = TaskTimeoutTracker.objects.only(
+                'last_updated', 'name', 'timeout_in_seconds').get(name=os.getenv('TRL_NAME'))
+            if trl.timed_out() and not tracker_refresher_enabled():
+                refresh_token_revocation_list(trl)
+                _trl_state['digests'] = _index_token_revocation_list(trl.value)
+            elif trl.last_updated != _trl_state['version']:
+                _trl_state['digests'] = _index_token_revocation_list(
+                    TaskTimeoutTracker.objects.values_list('value', flat=True).get(pk=trl.pk))
+            _trl_state['version'] = trl.last_updated
+            _trl_state['expires'] = time.time() + _tracker_expires_in(trl)
+        except Exception as exc:
+            print(exc)
+        return _trl_state['digests']
 
 
 def is_valid_uuid(val) -> bool:
@@ -197,27 +381,51 @@ def is_valid_uuid(val) -> bool:
 
 def get_api_user(request) -> ApiUser:
     """
-    Get API user
+    Get API user for this request
+    - resolved at most once per request and cached on the underlying HttpRequest (see ApiUserMiddleware)
+    - request.api_user_resolutions counts how many times resolution actually ran
+    """
+    http_request = getattr(request, '_request', request)
+    api_user = getattr(http_request, '_api_user', None)
+    if api_user is None:
+        api_user = resolve_api_user(request=request)
+        http_request._api_user = api_user
+        http_request.api_user_resolutions = getattr(http_request, 'api_user_resolutions', 0) + 1
+    return api_user
+
+
+def resolve_api_user(request) -> ApiUser:
+    """
+    Resolve API user
     - check for recent access to artifact-manager
     - if recent access not found, check for token and/or cookie settings
     - if found - use against core-api to get user details
     - store user details for short-term access (API_USER_REFRESH_CHECK_MINUTES)
     - if not found - return anonymous api_user object
     """
+    api_user = None
     try:
-        api_user = ApiUser.objects.filter(uuid=os.getenv('API_USER_ANON_UUID')).first()
         cookie = request.COOKIES.get(os.getenv('VOUCH_COOKIE_NAME'), None)
         token = request.headers.get('authorization', 'Bearer ').replace('Bearer ', '')
         now = datetime.now(timezone.utc)
+        if token:
+            # repeat callers: skip the TRL check, signature verification and the ApiUser query
+            token_digest = get_token_digest(token=token)
+            cached_api_user = get_verified_token_user(token_digest)
+            if cached_api_user and cached_api_user.access_expires > now:
+                return cached_api_user
         if token and not is_token_revoked(token=token):
-            oidc_sub = get_oidc_sub_from_token(token=token)
+            token_json = get_claims_from_token(token=token)
+            oidc_sub = token_json.get('sub') if token_json else None
             if oidc_sub:
                 api_user = ApiUser.objects.filter(cilogon_id=oidc_sub).first()
                 if api_user and api_user.access_expires > now:
+                        cache_verified_token(token_digest, oidc_sub, token_json.get('exp'), api_user)
                         return api_user
                 api_user = auth_user_by_token(token=token)
                 api_user.access_expires = now + timedelta(minutes=int(os.getenv('API_USER_REFRESH_CHECK_MINUTES')))
                 api_user.save()
+                cache_verified_token(token_digest, oidc_sub, token_json.get('exp'), api_user)
         if cookie:
             oidc_sub = get_oidc_sub_from_cookie(cookie=cookie)
             if oidc_sub:
@@ -229,6 +437,8 @@ def get_api_user(request) -> ApiUser:
                 api_user.save()
     except Exception as exc:
         print(exc)
+        api_user = None
+    # return api user (anonymous if not resolved from token or cookie)
+    if not api_user:
         api_user = ApiUser.objects.filter(uuid=os.getenv('API_USER_ANON_UUID')).first()
-    # return api user
     return api_user
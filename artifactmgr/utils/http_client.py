@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+Shared HTTP client for upstream FABRIC services (core-api, credmgr)
+    - one keep-alive requests.Session per worker with per-host connection pools
+    - connect / read timeouts on every call         <-- HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS
+    - pool sizing                                   <-- HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE
+    - credentials (cookies, auth) are passed per call and never stored on the shared session
+"""
+
+_session = None
+_session_lock = threading.Lock()
+
+# per-host upstream latency: host -> {'requests', 'errors', 'total_seconds', 'max_seconds'}
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+class _RejectCookiesPolicy(DefaultCookiePolicy):
+    """Never store response cookies on the shared session; they belong to whichever user made the call."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.cookies.set_policy(_RejectCookiesPolicy())
+            adapter = HTTPAdapter(
+                pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+                pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def get_timeout() -> tuple:
+    return (float(os.getenv('HTTP_CONNECT_TIMEOUT_SECONDS', 3.05)),
+            float(os.getenv('HTTP_READ_TIMEOUT_SECONDS', 10)))
+
+
+def http_get(url: str, headers: dict = None, cookies: dict = None, auth=None) -> requests.Response:
+    """
+    Issue a GET through the shared keep-alive session
+    - raises requests.exceptions.Timeout when the upstream exceeds the connect / read timeout
+    """
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    failed = False
+    try:
+        return get_session().get(url=url, headers=headers, cookies=cookies, auth=auth, timeout=get_timeout())
+    except Exception:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        with _latency_lock:
+            stats = _latency.setdefault(host, {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['requests'] += 1
+            stats['errors'] += 1 if failed else 0
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+
+def get_http_client_metrics() -> dict:
+    """
+    Connection pool and upstream latency metrics for this worker
+    - pools.reuse_rate - fraction of requests served on an already open (pooled) connection
+    - latency - per-host request count, error count, average and max latency in milliseconds
+    """
+    connections = 0
+    pooled_requests = 0
+    adapter = get_session().get_adapter('https://')
+    for key in adapter.poolmanager.pools.keys():
+        pool = adapter.poolmanager.pools.get(key)
+        if pool is not None:
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+    with _latency_lock:
+        latency = {
+            host: {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'avg_ms': round(stats['total_seconds'] / stats['requests'] * 1000, 2) if stats['requests'] else None,
+                'max_ms': round(stats['max_seconds'] * 1000, 2)
+            } for host, stats in _latency.items()
+        }
+    return {
+        'pools': {
+            'connections_opened': connections,
+            'requests': pooled_requests,
+            'reuse_rate': round(1 - connections / pooled_requests, 4) if pooled_requests else None
+        },
+        'latency': latency
+    }
@@ -0,0 +1,139 @@
+from django.db import connection, transaction
+from django.db.models import Case, Count, DateTimeField, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Greatest
+
+from artifactmgr.apps.apiuser.models import ApiUser
+from artifactmgr.apps.artifacts.models import Artifact, ProjectSummary
+
+"""
+Materialized project catalog (ProjectSummary)
+    - one row per project_uuid with artifacts: name, public_count, total_count, member_last_modified,
+      public_last_modified
+    - counts, modification times and name only include artifacts that show their project (show_project), matching
+      the ArtifactSerializer redaction; public_* only include public artifacts
+    - kept in sync by the artifacts signals (artifact save / delete) inside the writing transaction
+    - concurrent syncs of a project are serialized by a transaction-level advisory lock per project_uuid, taken
+      before the project's artifacts are read, so the last writer to commit recomputes from every committed change
+    - rebuild_project_summaries recomputes every project (backfill / consistency check)
+    - per-viewer counts and last_modified (projects_visible_to): total_count / member_last_modified for the viewer's
+      own projects, public_count / public_last_modified otherwise, plus a correction for the viewer's authored
+      artifacts that neither includes
+"""
+
+# Artifact fields that ProjectSummary is derived from
+SUMMARY_FIELDS = {'modified', 'project_name', 'project_uuid', 'show_project', 'visibility'}
+
+
+def _with_project(artifacts):
+    return artifacts.exclude(project_uuid__isnull=True).exclude(project_uuid='')
+
+
+def _summaries(project_uuids=None) -> list:
+    """
+    [ProjectSummary, ...] computed from the artifacts with one grouped query
+    - project_uuids None - all projects
+    """
+    artifacts = _with_project(Artifact.objects.all())
+    if project_uuids is not None:
+        artifacts = artifacts.filter(project_uuid__in=project_uuids)
+    latest_name = Artifact.objects.filter(
+        project_uuid=OuterRef('project_uuid'), project_name__isnull=False, show_project=True
+    ).order_by('-modified').values('project_name')[:1]
+    rows = artifacts.values('project_uuid').annotate(
+        member_last_modified=Max('modified', filter=Q(show_project=True)),
+        name=Subquery(latest_name),
+        public_count=Count('uuid', filter=Q(show_project=True, visibility=Artifact.PUBLIC)),
+        public_last_modified=Max('modified', filter=Q(show_project=True, visibility=Artifact.PUBLIC)),
+        total_count=Count('uuid', filter=Q(show_project=True))
+    ).order_by()
+    return [ProjectSummary(**row) for row in rows]
+
+
+def _lock(project_uuids=None) -> None:
+    """
+    Lock the summaries of project_uuids (all projects when None) until the end of the transaction
+    - ROW EXCLUSIVE on the table for a per-project sync (conflicts only with a rebuild), SHARE ROW EXCLUSIVE for a
+      rebuild (waits for in-flight syncs and blocks new ones until it commits)
+    - one pg_advisory_xact_lock per project, in sorted order so that two syncs of overlapping projects cannot
+      deadlock
+    """
+    with connection.cursor() as cursor:
+        if project_uuids is None:
+            cursor.execute('LOCK TABLE {0} IN SHARE ROW EXCLUSIVE MODE'.format(
+                connection.ops.quote_name(ProjectSummary._meta.db_table)))
+            return
+        cursor.execute('LOCK TABLE {0} IN ROW EXCLUSIVE MODE'.format(
+            connection.ops.quote_name(ProjectSummary._meta.db_table)))
+        for project_uuid in sorted(project_uuids):
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [project_uuid])
+
+
+def _sync(summaries: list, project_uuids=None) -> dict:
+    stale = ProjectSummary.objects.exclude(project_uuid__in=[summary.project_uuid for summary in summaries])
+    if project_uuids is not None:
+        stale = stale.filter(project_uuid__in=project_uuids)
+    deleted, _ = stale.delete()
+    if summaries:
+        ProjectSummary.objects.bulk_create(
+            summaries,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['project_uuid'],
+            update_fields=['member_last_modified', 'name', 'public_count', 'public_last_modified', 'total_count']
+        )
+    return {'projects': len(summaries), 'deleted': deleted}
+
+
+@transaction.atomic
+def sync_project_summaries(project_uuids) -> dict:
+    """
+    Recompute the ProjectSummary rows of the given projects (rows of projects left without artifacts are deleted)
+    """
+    project_uuids = [project_uuid for project_uuid in set(project_uuids) if project_uuid]
+    if not project_uuids:
+        return {'projects': 0, 'deleted': 0}
+    _lock(project_uuids)
+    return _sync(_summaries(project_uuids), project_uuids=project_uuids)
+
+
+@transaction.atomic
+def rebuild_project_summaries() -> dict:
+    """
+    Recompute ProjectSummary for all projects, returns the number of projects and of stale rows deleted
+    """
+    _lock()
+    return _sync(_summaries())
+
+
+def projects_visible_to(api_user: ApiUser):
+    """
+    ProjectSummary rows annotated with artifact_count - the number of the project's artifacts listed for api_user
+    (visible to the user and showing their project, or authored by the user) - and last_modified - the most recent
+    modification among those artifacts - only projects with a non-zero count
+    - total_count / member_last_modified for the user's projects (project members see every artifact of the project)
+    - public_count / public_last_modified for any other project
+    - plus one grouped query over the user's authored artifacts for those not already counted: artifacts hiding
+      their project, and non-public artifacts outside the user's projects
+    """
+    corrections = _with_project(Artifact.objects.authored_by(api_user.uuid)).filter(
+        Q(show_project=False) | (~Q(visibility=Artifact.PUBLIC) & ~Q(project_uuid__in=api_user.projects))
+    ).values('project_uuid').annotate(
+        count=Count('uuid'), modified=Max('modified')
+    ).order_by().values_list('project_uuid', 'count', 'modified')
+    count_correction, modified_correction = [], []
+    for project_uuid, count, modified in corrections:
+        count_correction.append(When(project_uuid=project_uuid, then=Value(count)))
+        modified_correction.append(When(project_uuid=project_uuid, then=Value(modified)))
+    is_member = Q(project_uuid__in=api_user.projects)
+    # GREATEST ignores NULL on PostgreSQL: the correction only applies to projects with authored artifacts
+    return ProjectSummary.objects.annotate(
+        artifact_count=Case(
+            When(is_member, then=F('total_count')),
+            default=F('public_count'), output_field=IntegerField()
+        ) + Case(*count_correction, default=Value(0), output_field=IntegerField()),
+        last_modified=Greatest(
+            Case(When(is_member, then=F('member_last_modified')), default=F('public_last_modified'),
+                 output_field=DateTimeField()),
+            Case(*modified_correction, default=Value(None), output_field=DateTimeField())
+        )
+    ).filter(artifact_count__gt=0)
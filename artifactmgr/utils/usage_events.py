@@ -0,0 +1,253 @@
+import atexit
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactVersion, ArtifactViews, VersionDownloads
+from artifactmgr.utils.hyperloglog import HyperLogLog
+
+"""
+Write-behind buffer for artifact view and version download events
+    - the request path only appends to a bounded in-memory queue; a per-worker flusher thread writes the events
+    - flush every USAGE_BUFFER_FLUSH_EVENTS events or USAGE_BUFFER_FLUSH_MILLISECONDS, whichever comes first
+    - each flush is one transaction: bulk_create of the event and M2M rows + one counter / unique-sketch UPDATE per
+      artifact / version
+    - loss bound: at most USAGE_BUFFER_MAX_EVENTS are held; when full the oldest event is dropped (counted, and
+      reported by the next flush or drain), statistics per worker at /api/meta/debug
+    - drained on worker shutdown (atexit and the uwsgi atexit hook, which also runs on max-requests recycling)
+    - USAGE_BUFFER_ENABLED=false writes every event synchronously in the request path
+"""
+
+VIEW = 'view'
+DOWNLOAD = 'download'
+
+_events = deque(maxlen=max(int(os.getenv('USAGE_BUFFER_MAX_EVENTS', 10000)), 1))
+_condition = threading.Condition()
+# serializes flushes between the flusher thread and a shutdown drain
+_flush_lock = threading.Lock()
+_flusher = {'pid': None, 'thread': None}
+_stats = {'recorded': 0, 'dropped': 0, 'flushed': 0, 'flushes': 0, 'failed_flushes': 0}
+# dropped count already reported by _report_dropped
+_reported = {'dropped': 0}
+
+
+def usage_buffer_enabled() -> bool:
+    return os.getenv('USAGE_BUFFER_ENABLED', 'true').casefold() == 'true'
+
+
+def record_artifact_view(artifact_uuid: str, viewed_by: str) -> None:
+    """
+    Record a view of an artifact (callers apply the author-exclusion rule)
+    """
+    _record({'type': VIEW, 'artifact': artifact_uuid, 'by': viewed_by})
+
+
+def record_version_download(version: ArtifactVersion, downloaded_by: str) -> None:
+    """
+    Record a download of an artifact version
+    - the download counts towards the artifact's active or retired rollup by the version's active flag at flush time
+    """
+    _record({'type': DOWNLOAD, 'artifact': version.artifact_id, 'version': version.uuid, 'by': downloaded_by})
+
+
+def _record(event: dict) -> None:
+    if not usage_buffer_enabled():
+        _write_usage_events([event])
+        return
+    _ensure_flusher()
+    with _condition:
+        if len(_events) == _events.maxlen:
+            _stats['dropped'] += 1
+        _events.append(event)
+        _stats['recorded'] += 1
+        if len(_events) >= int(os.getenv('USAGE_BUFFER_FLUSH_EVENTS', 100)):
+            _condition.notify()
+
+
+def _ensure_flusher() -> None:
+    """
+    Start the flusher thread once per worker process (threads do not survive the uwsgi fork)
+    """
+    with _condition:
+        if _flusher['pid'] == os.getpid() and _flusher['thread'].is_alive():
+            return
+        thread = threading.Thread(target=_run_flusher, name='usage-events-flusher', daemon=True)
+        _flusher['pid'] = os.getpid()
+        _flusher['thread'] = thread
+        thread.start()
+
+
+def _run_flusher() -> None:
+    while True:
+        with _condition:
+            # a full batch may have queued up while the previous flush was running: flush it right away
+            if len(_events) < int(os.getenv('USAGE_BUFFER_FLUSH_EVENTS', 100)):
+                _condition.wait(timeout=int(os.getenv('USAGE_BUFFER_FLUSH_MILLISECONDS', 1000)) / 1000)
+        close_old_connections()
+        failed_flushes = _stats['failed_flushes']
+        flush_usage_events()
+        if _stats['failed_flushes'] != failed_flushes:
+            # back off for one flush interval while the database is unavailable
+            time.sleep(int(os.getenv('USAGE_BUFFER_FLUSH_MILLISECONDS', 1000)) / 1000)
+
+
+def flush_usage_events() -> int:
+    """
+    Write all buffered events, returns the number of events written
+    - on failure the events are put back at the front of the queue (still subject to USAGE_BUFFER_MAX_EVENTS)
+    """
+    with _flush_lock:
+        try:
+            return _flush()
+        finally:
+            _report_dropped()
+
+
+def _flush() -> int:
+    with _condition:
+        events = list(_events)
+        _events.clear()
+    if not events:
+        return 0
+    try:
+        _write_usage_events(events)
+    except Exception as exc:
+        print(exc)
+        with _condition:
+            _stats['failed_flushes'] += 1
+            requeue = events[-(_events.maxlen - len(_events)):] if len(_events) < _events.maxlen else []
+            _stats['dropped'] += len(events) - len(requeue)
+            _events.extendleft(reversed(requeue))
+        return 0
+    with _condition:
+        _stats['flushed'] += len(events)
+        _stats['flushes'] += 1
+    return len(events)
+
+
+def _report_dropped() -> None:
+    """
+    Print the number of events dropped (buffer overflow or requeue after a failed flush) since the last report
+    """
+    with _condition:
+        dropped = _stats['dropped'] - _reported['dropped']
+        _reported['dropped'] = _stats['dropped']
+    if dropped:
+        print('[usage_events] pid {0}: dropped {1} usage event(s) (USAGE_BUFFER_MAX_EVENTS={2}), {3} in total'.format(
+            os.getpid(), dropped, _events.maxlen, _stats['dropped']))
+
+
+@transaction.atomic
+def _write_usage_events(events: list) -> None:
+    """
+    Persist a batch of events
+    - ArtifactViews / VersionDownloads rows and their M2M links with bulk_create
+    - counters (aggregated F() increments) and HyperLogLog unique viewer / downloader sketches with one UPDATE
+      per version, then per artifact, each locked in key order so that concurrent flushes (and version active
+      toggles) lock rows in the same order
+    - downloads are split into the artifact's active / retired rollups by the active flag of the locked version
+      row, so a toggle (which moves the version's download_count under the same lock) never double counts
+    """
+    # drop events for artifacts / versions deleted since they were recorded (their M2M rows would violate the FK)
+    artifacts = set(Artifact.objects.filter(
+        uuid__in={e.get('artifact') for e in events}).values_list('uuid', flat=True))
+    versions = set(ArtifactVersion.objects.filter(
+        uuid__in={e.get('version') for e in events if e.get('type') == DOWNLOAD}).values_list('uuid', flat=True))
+    views = [e for e in events if e.get('type') == VIEW and e.get('artifact') in artifacts]
+    downloads = [e for e in events if e.get('type') == DOWNLOAD and e.get('version') in versions]
+    if views:
+        rows = ArtifactViews.objects.bulk_create([ArtifactViews(viewed_by=e.get('by')) for e in views])
+        Artifact.artifact_views.through.objects.bulk_create([
+            Artifact.artifact_views.through(artifact_id=e.get('artifact'), artifactviews_id=row.pk)
+            for e, row in zip(views, rows)
+        ])
+    if downloads:
+        rows = VersionDownloads.objects.bulk_create([VersionDownloads(downloaded_by=e.get('by')) for e in downloads])
+        ArtifactVersion.version_downloads.through.objects.bulk_create([
+            ArtifactVersion.version_downloads.through(artifactversion_id=e.get('version'), versiondownloads_id=row.pk)
+            for e, row in zip(downloads, rows)
+        ])
+    # counters and unique sketches: one UPDATE per row, locking versions then artifacts in key order
+    version_downloaders = defaultdict(list)
+    for e in downloads:
+        version_downloaders[e.get('version')].append(e.get('by'))
+    version_active = {}
+    for version in ArtifactVersion.objects.select_for_update().filter(
+            uuid__in=version_downloaders).only('uuid', 'active', 'downloaders_sketch').order_by('uuid'):
+        version_active[version.uuid] = version.active
+        downloaders = HyperLogLog(version.downloaders_sketch)
+        for downloaded_by in version_downloaders.get(version.uuid):
+            downloaders.add(downloaded_by)
+        ArtifactVersion.objects.filter(uuid=version.uuid).update(
+            download_count=F('download_count') + len(version_downloaders.get(version.uuid)),
+            downloaders_sketch=downloaders.to_bytes(),
+            unique_downloaders=downloaders.count())
+    artifact_viewers = defaultdict(list)
+    for e in views:
+        artifact_viewers[e.get('artifact')].append(e.get('by'))
+    artifact_downloaders = defaultdict(list)
+    for e in downloads:
+        artifact_downloaders[e.get('artifact')].append(e.get('by'))
+    active = Counter(e.get('artifact') for e in downloads if version_active.get(e.get('version')))
+    retired = Counter(e.get('artifact') for e in downloads if not version_active.get(e.get('version')))
+    for artifact in Artifact.objects.select_for_update().filter(
+            uuid__in=set(artifact_viewers) | set(artifact_downloaders)).only(
+            'uuid', 'viewers_sketch', 'downloaders_sketch').order_by('uuid'):
+        viewers = HyperLogLog(artifact.viewers_sketch)
+        for viewed_by in artifact_viewers.get(artifact.uuid, []):
+            viewers.add(viewed_by)
+        downloaders = HyperLogLog(artifact.downloaders_sketch)
+        for downloaded_by in artifact_downloaders.get(artifact.uuid, []):
+            downloaders.add(downloaded_by)
+        Artifact.objects.filter(uuid=artifact.uuid).update(
+            view_count=F('view_count') + len(artifact_viewers.get(artifact.uuid, [])),
+            downloads_active=F('downloads_active') + active.get(artifact.uuid, 0),
+            downloads_retired=F('downloads_retired') + retired.get(artifact.uuid, 0),
+            viewers_sketch=viewers.to_bytes(),
+            unique_viewers=viewers.count(),
+            downloaders_sketch=downloaders.to_bytes(),
+            unique_downloaders=downloaders.count())
+
+
+def drain_usage_events() -> None:
+    """
+    Flush whatever is buffered; registered to run on worker shutdown
+    """
+    try:
+        flush_usage_events()
+    except Exception as exc:
+        print(exc)
+
+
+def get_usage_buffer_stats() -> dict:
+    """
+    Per-worker buffer statistics (recorded, dropped, flushed, flushes, failed_flushes, pending)
+    """
+    with _condition:
+        return dict(_stats, pending=len(_events))
+
+
+def _register_uwsgi_atexit() -> None:
+    """
+    uwsgi does not reliably run python atexit handlers in workers; chain a drain onto any existing uwsgi hook
+    """
+    try:
+        import uwsgi
+    except ImportError:
+        return
+    previous = getattr(uwsgi, 'atexit', None)
+
+    def _drain():
+        drain_usage_events()
+        if previous:
+            previous()
+
+    uwsgi.atexit = _drain
+
+
+atexit.register(drain_usage_events)
+_register_uwsgi_atexit()
@@ -0,0 +1,143 @@
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+
+from artifactmgr.apps.apiuser.models import TaskTimeoutTracker
+from artifactmgr.apps.artifacts.models import Artifact, ArtifactDailyUsage, ArtifactVersion, ArtifactViews, \
+    VersionDailyUsage, VersionDownloads
+from artifactmgr.utils.hyperloglog import HyperLogLog
+
+"""
+Incremental rollup of raw view / download events into daily buckets
+    - ArtifactDailyUsage - views and downloads per artifact per day (UTC)
+    - VersionDailyUsage - downloads per version per day (UTC)
+    - each bucket also carries HyperLogLog sketches of its distinct viewers / downloaders, mergeable across days
+    - the watermark (last rolled up ArtifactViews / VersionDownloads id) is kept as JSON in the usage_rollup
+      TaskTimeoutTracker value, so each run only reads events newer than the previous run
+    - events younger than lag_seconds are left for the next run so that batches still being committed are not skipped
+    - retention_days > 0 deletes rolled up raw events older than that many days
+"""
+
+
+def _id_range(model, since: int, cutoff: datetime, timestamp_field: str) -> int:
+    """
+    Highest event id above the watermark that is older than cutoff (the watermark itself when there is none)
+    """
+    upper = model.objects.filter(
+        id__gt=since, **{'{0}__lte'.format(timestamp_field): cutoff}
+    ).aggregate(upper=Max('id')).get('upper')
+    return upper or since
+
+
+@transaction.atomic
+def rollup_usage(retention_days: int = 0, lag_seconds: int = 300) -> dict:
+    """
+    Fold new raw events into the daily rollup tables, returns a summary of the run
+    - runs are serialized by a row lock on the usage_rollup TaskTimeoutTracker
+    """
+    now = datetime.now(timezone.utc)
+    tracker = TaskTimeoutTracker.objects.select_for_update().get(name=os.getenv('ROLLUP_NAME'))
+    watermark = json.loads(tracker.value) if tracker.value else {}
+    views_since = int(watermark.get('views', 0))
+    downloads_since = int(watermark.get('downloads', 0))
+    cutoff = now - timedelta(seconds=lag_seconds)
+    views_upto = _id_range(ArtifactViews, since=views_since, cutoff=cutoff, timestamp_field='viewed_at')
+    downloads_upto = _id_range(VersionDownloads, since=downloads_since, cutoff=cutoff,
+                               timestamp_field='downloaded_at')
+
+    # aggregate the new events per (artifact, day) and (version, day): counts and distinct viewers / downloaders
+    artifact_usage = defaultdict(lambda: {'views': 0, 'downloads': 0, 'viewers': HyperLogLog(),
+                                          'downloaders': HyperLogLog()})
+    version_usage = defaultdict(lambda: {'downloads': 0, 'downloaders': HyperLogLog()})
+    views = Artifact.artifact_views.through.objects.filter(
+        artifactviews_id__gt=views_since, artifactviews_id__lte=views_upto
+    ).annotate(
+        day=TruncDate('artifactviews__viewed_at', tzinfo=timezone.utc)
+    ).values('artifact_id', 'day', 'artifactviews__viewed_by').annotate(count=Count('*')).order_by()
+    for row in views:
+        usage = artifact_usage[(row.get('artifact_id'), row.get('day'))]
+        usage['views'] += row.get('count')
+        usage['viewers'].add(row.get('artifactviews__viewed_by'))
+    downloads = ArtifactVersion.version_downloads.through.objects.filter(
+        versiondownloads_id__gt=downloads_since, versiondownloads_id__lte=downloads_upto
+    ).annotate(
+        day=TruncDate('versiondownloads__downloaded_at', tzinfo=timezone.utc)
+    ).values(
+        'artifactversion_id', 'artifactversion__artifact_id', 'day', 'versiondownloads__downloaded_by'
+    ).annotate(count=Count('*')).order_by()
+    for row in downloads:
+        usage = artifact_usage[(row.get('artifactversion__artifact_id'), row.get('day'))]
+        usage['downloads'] += row.get('count')
+        usage['downloaders'].add(row.get('versiondownloads__downloaded_by'))
+        usage = version_usage[(row.get('artifactversion_id'), row.get('day'))]
+        usage['downloads'] += row.get('count')
+        usage['downloaders'].add(row.get('versiondownloads__downloaded_by'))
+
+    # merge the new counts and sketches into the existing buckets and upsert them
+    if artifact_usage:
+        existing = ArtifactDailyUsage.objects.filter(
+            artifact_id__in={key[0] for key in artifact_usage}, day__in={key[1] for key in artifact_usage})
+        for bucket in existing:
+            usage = artifact_usage.get((bucket.artifact_id, bucket.day))
+            if usage:
+                usage['views'] += bucket.views
+                usage['downloads'] += bucket.downloads
+                usage['viewers'].merge(bucket.viewers_sketch)
+                usage['downloaders'].merge(bucket.downloaders_sketch)
+        ArtifactDailyUsage.objects.bulk_create(
+            [ArtifactDailyUsage(artifact_id=artifact_uuid, day=day, views=usage.get('views'),
+                                downloads=usage.get('downloads'), viewers_sketch=usage.get('viewers').to_bytes(),
+                                downloaders_sketch=usage.get('downloaders').to_bytes())
+             for (artifact_uuid, day), usage in artifact_usage.items()],
+            update_conflicts=True,
+            unique_fields=['artifact', 'day'],
+            update_fields=['views', 'downloads', 'viewers_sketch', 'downloaders_sketch']
+        )
+    if version_usage:
+        existing = VersionDailyUsage.objects.filter(
+            version_id__in={key[0] for key in version_usage}, day__in={key[1] for key in version_usage})
+        for bucket in existing:
+            usage = version_usage.get((bucket.version_id, bucket.day))
+            if usage:
+                usage['downloads'] += bucket.downloads
+                usage['downloaders'].merge(bucket.downloaders_sketch)
+        VersionDailyUsage.objects.bulk_create(
+            [VersionDailyUsage(version_id=version_uuid, day=day, downloads=usage.get('downloads'),
+                               downloaders_sketch=usage.get('downloaders').to_bytes())
+             for (version_uuid, day), usage in version_usage.items()],
+            update_conflicts=True,
+            unique_fields=['version', 'day'],
+            update_fields=['downloads', 'downloaders_sketch']
+        )
+
+    # prune raw events that have been rolled up and are past retention
+    pruned_views = pruned_downloads = 0
+    if retention_days > 0:
+        prune_before = now - timedelta(days=retention_days)
+        pruned_views = ArtifactViews.objects.filter(id__lte=views_upto, viewed_at__lt=prune_before).delete()[0]
+        pruned_downloads = VersionDownloads.objects.filter(
+            id__lte=downloads_upto, downloaded_at__lt=prune_before).delete()[0]
+
+    tracker.value = json.dumps({'views': views_upto, 'downloads': downloads_upto})
+    tracker.last_updated = now
+    tracker.save(update_fields=['value', 'last_updated'])
+    return {
+        'views': views_upto - views_since,
+        'downloads': downloads_upto - downloads_since,
+        'artifact_buckets': len(artifact_usage),
+        'version_buckets': len(version_usage),
+        'pruned_views': pruned_views,
+        'pruned_downloads': pruned_downloads
+    }
+
+
+def refresh_usage_rollup(rollup: TaskTimeoutTracker) -> None:
+    """
+    Run the usage rollup from the task timeout tracker refresher (every ROLLUP_TIMEOUT_IN_SECONDS)
+    """
+    rollup_usage(retention_days=int(os.getenv('USAGE_RETENTION_DAYS', 0)))
@@ -75,11 +75,10 @@ else
     FIXTURES_LIST=()
 fi
 
-# migrations files
+# migrations files (checked in; -m only for local model development)
 for app in "${APPS_LIST[@]}"; do
     python manage.py makemigrations $app
 done
-python manage.py makemigrations
 python manage.py showmigrations
 python manage.py migrate
 
@@ -87,6 +86,13 @@ python manage.py migrate
 for fixture in "${FIXTURES_LIST[@]}"; do
     python manage.py loaddata $fixture
 done
+# fixtures are loaded raw (no signals): rebuild the derived tables from them
+if [[ ${#FIXTURES_LIST[@]} -gt 0 ]]; then
+    python manage.py rebuild_artifact_access
+    python manage.py rebuild_search_vectors
+    python manage.py rebuild_project_summaries
+    python manage.py backfill_usage_counters
+fi
 
 # static files
 python manage.py collectstatic --noinput
@@ -99,19 +105,33 @@ python manage.py init_task_timeout_tracker
 echo "### INIT anonymous api_user ###"
 python manage.py init_anon_api_user
 
+# background task timeout tracker refresher (uwsgi attaches and supervises it as a daemon)
+UWSGI_DAEMONS=()
+if [[ "${TRACKER_REFRESHER_ENABLED,,}" == "true" ]]; then
+    echo "### TRACKER_REFRESHER_ENABLED = True ###"
+    UWSGI_DAEMONS=(--attach-daemon ".venv/bin/python manage.py run_tracker_refresher")
+else
+    echo "### TRACKER_REFRESHER_ENABLED = False ###"
+fi
+
 # run mode
 case "${RUN_MODE}" in
     local-dev)
         echo "local-dev"
+        if [[ "${TRACKER_REFRESHER_ENABLED,,}" == "true" ]]; then
+            python manage.py run_tracker_refresher &
+        fi
         python manage.py runserver 0.0.0.0:8000
         ;;
     local-ssl)
         echo "local-ssl"
-        .venv/bin/uwsgi --uid "${UWSGI_UID:-1000}" --gid "${UWSGI_GID:-1000}" --virtualenv .venv --ini artifactmgr.ini
+        .venv/bin/uwsgi --uid "${UWSGI_UID:-1000}" --gid "${UWSGI_GID:-1000}" --virtualenv .venv --ini artifactmgr.ini \
+            "${UWSGI_DAEMONS[@]}"
         ;;
     docker)
         echo "docker"
-        .venv/bin/uwsgi --uid "${UWSGI_UID:-1000}" --gid "${UWSGI_GID:-1000}" --virtualenv .venv --ini artifactmgr.ini
+        .venv/bin/uwsgi --uid "${UWSGI_UID:-1000}" --gid "${UWSGI_GID:-1000}" --virtualenv .venv --ini artifactmgr.ini \
+            "${UWSGI_DAEMONS[@]}"
         ;;
     *)
         echo "ModeRequired: -r | --run-mode <local-dev | local-ssl | docker>"